@@ -19,8 +19,15 @@ sys.path.insert(0, current_dir)
 try:
     from config import Config
     from database import Database
-    from images import ImageGenerator
-    from utils.logger import setup_logger, log_to_channel
+    from images import image_gen as shared_image_gen
+    from utils.logger import setup_logger, log_to_channel, log_shipper, stop_logging
+    from utils.http import http_client
+    from utils.events import events
+    from utils.middleware import (
+        ApiTimingMiddleware, CommandEventMiddleware, UpdateMetricsMiddleware, registered_commands
+    )
+    from utils.metrics import RequestErrorHandler
+    from utils.metrics_server import metrics_server
     from utils.helpers import get_target_user, format_money, format_time, check_cooldown, set_cooldown
     
     # Import handlers
@@ -73,8 +80,12 @@ async def startup():
         await db_instance.connect()
         logger.info("✅ Database connected")
         
-        # Initialize image generator
-        image_gen = ImageGenerator()
+        # Shared HTTP client for outbound downloads
+        await http_client.start()
+        
+        # Initialize image generator (same instance the handlers use)
+        image_gen = shared_image_gen
+        image_gen.start_pool()
         logger.info("✅ Image generator initialized")
         
         # Initialize bot
@@ -83,10 +94,22 @@ async def startup():
             default=DefaultBotProperties(parse_mode=ParseMode.HTML)
         )
         
+        # Time outgoing Bot API calls for /perf
+        bot_instance.session.middleware(ApiTimingMiddleware())
+        
+        # Ship channel logs in the background
+        log_shipper.start(bot_instance)
+        
         # Initialize dispatcher
         storage = MemoryStorage()
         dp_instance = Dispatcher(storage=storage)
         
+        # Update throughput, command latency metrics and analytics events
+        dp_instance.update.outer_middleware(UpdateMetricsMiddleware())
+        dp_instance.message.outer_middleware(CommandEventMiddleware())
+        # Errors handlers catch and log still count against the command
+        logging.getLogger().addHandler(RequestErrorHandler())
+        
         # Include routers
         dp_instance.include_router(family_router)
         dp_instance.include_router(economy_router)
@@ -120,16 +143,32 @@ async def startup():
 
 async def shutdown():
     """Graceful shutdown"""
-    global bot_instance, dp_instance, db_instance
+    global bot_instance, dp_instance, db_instance, image_gen
     
     try:
         logger.info("🛑 Shutting down bot...")
         
+        # Stop serving metrics
+        await metrics_server.stop()
+        
+        # Stop render workers
+        if image_gen:
+            image_gen.shutdown_pool()
+        
+        # Close HTTP client
+        await http_client.close()
+        
         # Close database
         if db_instance:
             await db_instance.close()
             logger.info("✅ Database closed")
         
+        # Write queued analytics events
+        events.stop()
+        
+        # Send remaining channel logs before the session closes
+        await log_shipper.stop()
+        
         # Close bot session
         if bot_instance:
             await bot_instance.session.close()
@@ -139,6 +178,7 @@ async def shutdown():
         logger.error(f"❌ Shutdown error: {e}")
     finally:
         logger.info("👋 Bot stopped")
+        stop_logging()
 
 async def error_handler(update, exception):
     """Global error handler"""
@@ -169,6 +209,10 @@ async def main():
         logger.info("🤖 Bot is now running...")
         logger.info(f"👑 Owner ID: {Config.OWNER_ID}")
         
+        # Optional Prometheus endpoint, served next to polling
+        if Config.METRICS_PORT:
+            await metrics_server.start(db_instance, image_gen, registered_commands(dp_instance))
+        
         # Start polling
         await dp_instance.start_polling(
             bot_instance, 
@@ -22,9 +22,37 @@ class Config:
     admin_ids_str = os.getenv("ADMIN_IDS", "6108185460")
     ADMIN_IDS = [int(id.strip()) for id in admin_ids_str.split(",")] if admin_ids_str else []
     
+    # Logs Directory
+    LOGS_DIR = os.getenv("LOGS_DIR", "logs")
+    
+    # Structured Analytics Events (JSON lines)
+    EVENTS_ENABLED = os.getenv("EVENTS_ENABLED", "1") == "1"
+    EVENTS_DIR = os.getenv("EVENTS_DIR", os.path.join(LOGS_DIR, "events"))
+    # Sampling per event type, e.g. "command:1,economy:0.25" (unlisted types: 1)
+    event_rates_str = os.getenv("EVENT_SAMPLE_RATES", "command:1,economy:1")
+    EVENT_SAMPLE_RATES = {
+        name.strip(): float(rate)
+        for name, rate in (item.split(":") for item in event_rates_str.split(",") if ":" in item)
+    }
+    EVENT_BATCH_SIZE = int(os.getenv("EVENT_BATCH_SIZE", "256"))
+    EVENT_FLUSH_INTERVAL = float(os.getenv("EVENT_FLUSH_INTERVAL", "1"))  # seconds
+    
     # Database Path
     DB_PATH = os.getenv("DB_PATH", "/data/family_bot.db")
     
+    # Database Pool Settings
+    DB_READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", "4"))  # 0 = single shared connection
+    DB_BUSY_TIMEOUT = int(os.getenv("DB_BUSY_TIMEOUT", "5000"))  # ms
+    
+    # Group commit: coalesce concurrent writes into one transaction
+    DB_BATCH_WRITES = os.getenv("DB_BATCH_WRITES", "1") == "1"
+    DB_BATCH_INTERVAL_MS = int(os.getenv("DB_BATCH_INTERVAL_MS", "5"))
+    DB_BATCH_MAX_SIZE = int(os.getenv("DB_BATCH_MAX_SIZE", "100"))
+    
+    # In-memory user row cache
+    USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "5000"))
+    USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "300"))  # seconds
+    
     # Bot Settings
     BOT_USERNAME = os.getenv("BOT_USERNAME", "FamilyTreeBot")
     VERSION = os.getenv("VERSION", "2.0.0")
@@ -40,6 +68,8 @@ class Config:
     ADOPT_BONUS = 1000
     MARRY_BONUS = 5000
     FAMILY_DAILY_BONUS = 50
+    FAMILY_TREE_MAX_DEPTH = 5  # generations up and down
+    FAMILY_TREE_MAX_NODES = 100
     
     # Garden Settings
     STARTING_GARDEN_SLOTS = 9
@@ -50,5 +80,51 @@ class Config:
     SLOT_MIN_BET = 10
     SLOT_MAX_BET = 10000
     
+    # Image Rendering Settings
+    FONTS_DIR = os.getenv("FONTS_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "fonts"))
+    FONT_REGULAR = os.getenv("FONT_REGULAR", "DejaVuSans.ttf")
+    FONT_BOLD = os.getenv("FONT_BOLD", "DejaVuSans-Bold.ttf")
+    EMOJI_DIR = os.getenv("EMOJI_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "emoji"))
+    EMOJI_FONT = os.getenv("EMOJI_FONT", "")  # optional NotoColorEmoji.ttf path
+    IMAGE_EXECUTOR = os.getenv("IMAGE_EXECUTOR", "process")  # process or thread
+    IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+    IMAGE_QUEUE_DEPTH = int(os.getenv("IMAGE_QUEUE_DEPTH", "16"))
+    IMAGE_RENDER_TIMEOUT = float(os.getenv("IMAGE_RENDER_TIMEOUT", "10"))  # seconds
+    # Encoding per template (see scripts/bench_encoding.py). Telegram
+    # re-encodes photos as JPEG anyway, so cards use JPEG; the noisy
+    # scratch texture stays PNG.
+    IMAGE_ENCODING = {
+        "default": {"format": "PNG", "compress_level": 6},
+        "profile": {"format": "JPEG", "quality": 85, "optimize": True},
+        "family_tree": {"format": "JPEG", "quality": 85, "optimize": True},
+        "garden": {"format": "JPEG", "quality": 85, "optimize": True},
+        "scratch": {"format": "PNG", "compress_level": 6},
+    }
+    IMAGE_FAST_ENCODE = os.getenv("IMAGE_FAST_ENCODE", "0") == "1"  # PNG level 1, no optimize passes
+    AVATAR_FETCH_TIMEOUT = float(os.getenv("AVATAR_FETCH_TIMEOUT", "5"))  # seconds
+    AVATAR_CACHE_DIR = os.getenv("AVATAR_CACHE_DIR", "/data/cache/avatars")
+    AVATAR_CACHE_MAX_MB = int(os.getenv("AVATAR_CACHE_MAX_MB", "50"))
+    AVATAR_REVALIDATE_TTL = int(os.getenv("AVATAR_REVALIDATE_TTL", "3600"))  # seconds
+    RENDER_CACHE_DIR = os.getenv("RENDER_CACHE_DIR", "/data/cache/renders")
+    RENDER_CACHE_MEMORY_ITEMS = int(os.getenv("RENDER_CACHE_MEMORY_ITEMS", "256"))
+    RENDER_CACHE_MAX_MB = int(os.getenv("RENDER_CACHE_MAX_MB", "200"))
+    
+    # Outbound HTTP Settings
+    HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "100"))
+    HTTP_PER_HOST_LIMIT = int(os.getenv("HTTP_PER_HOST_LIMIT", "20"))
+    HTTP_KEEPALIVE = float(os.getenv("HTTP_KEEPALIVE", "30"))  # seconds
+    HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "10"))  # seconds
+    HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3"))  # seconds
+    HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "2"))
+    HTTP_RETRY_BACKOFF = float(os.getenv("HTTP_RETRY_BACKOFF", "0.2"))  # seconds
+    
+    # Log Channel Shipping
+    LOG_FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", "2"))  # seconds between channel messages
+    LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "500"))  # oldest dropped beyond this
+    
+    # Prometheus Metrics Endpoint (0 = disabled)
+    METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+    METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+    
     # Business Settings
     BUSINESS_INTERVAL = 3600  # 1 hour
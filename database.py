@@ -4,30 +4,152 @@ SQLite database operations
 """
 
 import aiosqlite
+import asyncio
+import contextvars
 import logging
 import json
+import re
+import time
+from contextlib import asynccontextmanager
 from datetime import datetime
 from config import Config
+from utils.cache import LRUCache
+from utils.events import events
+from utils.metrics import timed, track
 
 logger = logging.getLogger(__name__)
 
+# Balance names accepted by adjust_balance
+BALANCE_COLUMNS = {
+    "cash": "cash",
+    "bank": "bank_balance",
+    "bank_balance": "bank_balance"
+}
+
+# Relation as seen from the other member of a family edge
+INVERSE_RELATIONS = {
+    "child": "parent",
+    "parent": "child",
+    "spouse": "spouse"
+}
+
+# Bank transfers: (debited balance, credited balance, ledger description)
+BANK_TRANSFERS = {
+    "deposit": ("cash", "bank_balance", "Cash deposit"),
+    "withdraw": ("bank_balance", "cash", "Cash withdrawal")
+}
+
+# Versioned schema migrations: (version, description, statements)
+# Applied in order on connect, each in its own transaction.
+MIGRATIONS = [
+    (1, "Add columns missing from older databases", [
+        "ALTER TABLE users ADD COLUMN is_banned BOOLEAN DEFAULT 0",
+        "ALTER TABLE users ADD COLUMN warnings INTEGER DEFAULT 0",
+        "ALTER TABLE plants ADD COLUMN grow_time REAL DEFAULT 0",
+        "ALTER TABLE plants ADD COLUMN is_ready BOOLEAN DEFAULT 0"
+    ]),
+    (2, "Index hot query paths", [
+        # get_family: f.user1_id = ? OR f.user2_id = ?
+        "CREATE INDEX IF NOT EXISTS idx_family_user1 ON family(user1_id)",
+        "CREATE INDEX IF NOT EXISTS idx_family_user2 ON family(user2_id)",
+        # /leaderboard: ORDER BY cash DESC LIMIT 10
+        "CREATE INDEX IF NOT EXISTS idx_users_cash ON users(cash DESC)",
+        # /statement: WHERE user_id = ? ORDER BY created_at DESC
+        "CREATE INDEX IF NOT EXISTS idx_transactions_user_created ON transactions(user_id, created_at)",
+        # get_random_gif: WHERE category = ?
+        "CREATE INDEX IF NOT EXISTS idx_gifs_category ON gifs(category)",
+        # get_plants and /mytickets: WHERE user_id = ?
+        "CREATE INDEX IF NOT EXISTS idx_plants_user ON plants(user_id)",
+        "CREATE INDEX IF NOT EXISTS idx_lottery_user_purchased ON lottery_tickets(user_id, purchased_at)"
+    ]),
+    (3, "Backfill family_edges from family", [
+        """INSERT OR IGNORE INTO family_edges (user_id, member_id, relation, created_at)
+           SELECT user1_id, user2_id, relation, created_at FROM family""",
+        """INSERT OR IGNORE INTO family_edges (user_id, member_id, relation, created_at)
+           SELECT user2_id, user1_id,
+                  CASE relation WHEN 'child' THEN 'parent'
+                                WHEN 'parent' THEN 'child'
+                                ELSE relation END,
+                  created_at
+           FROM family"""
+    ])
+]
+
+ADD_COLUMN_RE = re.compile(r"ALTER TABLE (\w+) ADD COLUMN (\w+)", re.IGNORECASE)
+
+# Transaction opened by db.transaction() in the current task
+_current_transaction = contextvars.ContextVar("db_transaction", default=None)
+
+class _Transaction:
+    """State of an open db.transaction() block"""
+    
+    def __init__(self, db):
+        self.db = db
+        self.error = None
+        self.touched_users = set()
+        self.events = []
+
 class Database:
     def __init__(self):
         self.db_path = Config.DB_PATH
         self.conn = None
         
+        # Read lane: pool of query-only connections
+        self.read_pool_size = Config.DB_READ_POOL_SIZE
+        self._readers = []
+        self._read_queue = None
+        
+        # Write lane: single serialized writer (self.conn)
+        self._write_lock = None
+        
+        # Group commit: writes queued here are committed in batches
+        self._write_queue = None
+        self._writer_task = None
+        
+        # Queue-wait stats per lane
+        self.pool_stats = {
+            "read": {"count": 0, "wait_total": 0.0, "wait_max": 0.0},
+            "write": {"count": 0, "wait_total": 0.0, "wait_max": 0.0}
+        }
+        self.batch_stats = {"batches": 0, "writes": 0, "max_size": 0}
+        
+        # Write-through cache of user rows
+        self.user_cache = LRUCache(Config.USER_CACHE_SIZE, Config.USER_CACHE_TTL)
+        self._user_writes = 0
+        
     async def connect(self):
         """Connect to database"""
         try:
             self.conn = await aiosqlite.connect(self.db_path)
             await self.conn.execute("PRAGMA journal_mode=WAL")
+            await self.conn.execute(f"PRAGMA busy_timeout = {Config.DB_BUSY_TIMEOUT}")
+            self._write_lock = asyncio.Lock()
             await self.init_tables()
+            await self.run_migrations()
+            await self.open_read_pool()
+            self.start_writer()
             logger.info(f"✅ Database connected: {self.db_path}")
             return True
         except Exception as e:
             logger.error(f"❌ Database connection error: {e}")
             return False
     
+    async def open_read_pool(self):
+        """Open read-only connections for fetch_one/fetch_all"""
+        # In-memory databases are private to one connection
+        if self.read_pool_size <= 0 or self.db_path == ":memory:":
+            logger.info("ℹ️ Read pool disabled, using single connection")
+            return
+        
+        self._read_queue = asyncio.Queue()
+        for _ in range(self.read_pool_size):
+            reader = await aiosqlite.connect(self.db_path)
+            await reader.execute("PRAGMA query_only = ON")
+            await reader.execute(f"PRAGMA busy_timeout = {Config.DB_BUSY_TIMEOUT}")
+            self._readers.append(reader)
+            self._read_queue.put_nowait(reader)
+        logger.info(f"✅ Read pool opened: {self.read_pool_size} connections")
+    
     async def init_tables(self):
         """Initialize all tables"""
         tables = [
@@ -45,6 +167,8 @@ class Database:
                 daily_streak INTEGER DEFAULT 0,
                 last_daily TIMESTAMP,
                 bio_verified BOOLEAN DEFAULT FALSE,
+                is_banned BOOLEAN DEFAULT 0,
+                warnings INTEGER DEFAULT 0,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )""",
             
@@ -59,6 +183,15 @@ class Database:
                 FOREIGN KEY (user2_id) REFERENCES users(user_id)
             )""",
             
+            # Family relations, one row per direction
+            """CREATE TABLE IF NOT EXISTS family_edges (
+                user_id INTEGER NOT NULL,
+                member_id INTEGER NOT NULL,
+                relation TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (user_id, member_id, relation)
+            ) WITHOUT ROWID""",
+            
             # Garden
             """CREATE TABLE IF NOT EXISTS gardens (
                 user_id INTEGER PRIMARY KEY,
@@ -75,7 +208,9 @@ class Database:
                 crop_type TEXT NOT NULL,
                 quantity INTEGER DEFAULT 1,
                 planted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                grow_time REAL DEFAULT 0,
                 current_progress REAL DEFAULT 0,
+                is_ready BOOLEAN DEFAULT 0,
                 FOREIGN KEY (user_id) REFERENCES users(user_id)
             )""",
             
@@ -114,6 +249,49 @@ class Database:
                 command TEXT NOT NULL,
                 last_used TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 PRIMARY KEY (user_id, command)
+            )""",
+            
+            # Bank transactions ledger
+            """CREATE TABLE IF NOT EXISTS transactions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                type TEXT NOT NULL,
+                amount INTEGER NOT NULL,
+                description TEXT,
+                balance_after INTEGER,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES users(user_id)
+            )""",
+            
+            # Bank interest tracking
+            """CREATE TABLE IF NOT EXISTS bank_accounts (
+                user_id INTEGER PRIMARY KEY,
+                total_interest INTEGER DEFAULT 0,
+                last_interest TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES users(user_id)
+            )""",
+            
+            # Lottery tickets
+            """CREATE TABLE IF NOT EXISTS lottery_tickets (
+                ticket_id TEXT PRIMARY KEY,
+                user_id INTEGER NOT NULL,
+                numbers TEXT NOT NULL,
+                scratched BOOLEAN DEFAULT 0,
+                scratched_at TIMESTAMP,
+                is_winner BOOLEAN DEFAULT 0,
+                purchased_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES users(user_id)
+            )""",
+            
+            # Businesses
+            """CREATE TABLE IF NOT EXISTS businesses (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                business_type TEXT NOT NULL,
+                level INTEGER DEFAULT 1,
+                last_collected TIMESTAMP,
+                total_earned INTEGER DEFAULT 0,
+                FOREIGN KEY (user_id) REFERENCES users(user_id)
             )"""
         ]
         
@@ -125,26 +303,306 @@ class Database:
         except Exception as e:
             logger.error(f"❌ Table initialization error: {e}")
     
+    def start_writer(self):
+        """Start the group-commit writer task"""
+        if not Config.DB_BATCH_WRITES:
+            return
+        self._write_queue = asyncio.Queue()
+        self._writer_task = asyncio.create_task(self._write_loop())
+        logger.info(
+            f"✅ Group commit enabled: {Config.DB_BATCH_INTERVAL_MS}ms / "
+            f"{Config.DB_BATCH_MAX_SIZE} writes per batch"
+        )
+    
+    async def _write_loop(self):
+        """Collect queued writes and commit them together"""
+        loop = asyncio.get_running_loop()
+        interval = Config.DB_BATCH_INTERVAL_MS / 1000
+        running = True
+        
+        while running:
+            item = await self._write_queue.get()
+            if item is None:
+                break
+            
+            batch = [item]
+            deadline = loop.time() + interval
+            while len(batch) < Config.DB_BATCH_MAX_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._write_queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    running = False
+                    break
+                batch.append(item)
+            
+            await self._commit_batch(batch)
+    
+    async def _commit_batch(self, batch):
+        """Run a batch in one transaction, one savepoint per write"""
+        async with self._write_lock:
+            results = []
+            try:
+                await self.conn.execute("BEGIN")
+                for statements, fetch, _ in batch:
+                    await self.conn.execute("SAVEPOINT batch_item")
+                    try:
+                        row = await self._run_write(statements, fetch)
+                        await self.conn.execute("RELEASE batch_item")
+                        results.append((True, row))
+                    except Exception as e:
+                        # Undo only this caller's write
+                        await self.conn.execute("ROLLBACK TO batch_item")
+                        await self.conn.execute("RELEASE batch_item")
+                        logger.error(f"Execute error: {e}")
+                        results.append((False, None))
+                await self.conn.commit()
+            except Exception as e:
+                logger.error(f"Batch commit error: {e}")
+                try:
+                    await self.conn.rollback()
+                except Exception:
+                    pass
+                results = [(False, None)] * len(batch)
+        
+        self.batch_stats["batches"] += 1
+        self.batch_stats["writes"] += len(batch)
+        self.batch_stats["max_size"] = max(self.batch_stats["max_size"], len(batch))
+        
+        for (_, _, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+    
+    async def stop_writer(self):
+        """Flush pending writes and stop the writer task"""
+        if self._writer_task:
+            await self._write_queue.put(None)
+            await self._writer_task
+            self._writer_task = None
+            self._write_queue = None
+    
+    async def get_schema_version(self):
+        """Get the highest applied migration version"""
+        cursor = await self.conn.execute("SELECT MAX(version) FROM schema_migrations")
+        row = await cursor.fetchone()
+        await cursor.close()
+        return row[0] or 0
+    
+    async def _column_exists(self, table, column):
+        """Check if a table already has a column"""
+        cursor = await self.conn.execute(f"PRAGMA table_info({table})")
+        rows = await cursor.fetchall()
+        await cursor.close()
+        return any(row[1] == column for row in rows)
+    
+    async def run_migrations(self):
+        """Apply pending schema migrations"""
+        await self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                description TEXT NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )"""
+        )
+        await self.conn.commit()
+        
+        current = await self.get_schema_version()
+        for version, description, statements in MIGRATIONS:
+            if version <= current:
+                continue
+            
+            async with self.transaction():
+                for sql in statements:
+                    # Fresh databases already have these from init_tables
+                    match = ADD_COLUMN_RE.match(sql)
+                    if match and await self._column_exists(*match.groups()):
+                        continue
+                    await self.execute(sql)
+                await self.execute(
+                    "INSERT INTO schema_migrations (version, description) VALUES (?, ?)",
+                    (version, description)
+                )
+            logger.info(f"✅ Migration {version} applied: {description}")
+        
+        logger.info(f"✅ Schema version: {await self.get_schema_version()}")
+    
     async def close(self):
         """Close database connection"""
+        await self.stop_writer()
+        
+        for reader in self._readers:
+            await reader.close()
+        self._readers = []
+        self._read_queue = None
+        
         if self.conn:
             await self.conn.close()
             logger.info("✅ Database connection closed")
     
+    def _record_wait(self, lane, waited):
+        """Record time spent waiting for a connection"""
+        stats = self.pool_stats[lane]
+        stats["count"] += 1
+        stats["wait_total"] += waited
+        stats["wait_max"] = max(stats["wait_max"], waited)
+    
+    def get_pool_stats(self):
+        """Get queue-wait stats for the read and write lanes (ms)"""
+        result = {"read_pool_size": len(self._readers)}
+        for lane, stats in self.pool_stats.items():
+            count = stats["count"]
+            result[lane] = {
+                "count": count,
+                "avg_wait_ms": round(stats["wait_total"] / count * 1000, 3) if count else 0.0,
+                "max_wait_ms": round(stats["wait_max"] * 1000, 3)
+            }
+        batches = self.batch_stats["batches"]
+        result["batches"] = {
+            "count": batches,
+            "writes": self.batch_stats["writes"],
+            "avg_size": round(self.batch_stats["writes"] / batches, 2) if batches else 0.0,
+            "max_size": self.batch_stats["max_size"]
+        }
+        return result
+    
+    @asynccontextmanager
+    async def transaction(self):
+        """
+        Run a block of writes in one BEGIN/COMMIT
+        
+        Rolls back if the block raises or any statement in it fails.
+        Nested blocks join the outer transaction.
+        """
+        current = _current_transaction.get()
+        if current is not None and current.db is self:
+            yield self
+            return
+        
+        start = time.perf_counter()
+        async with self._write_lock:
+            self._record_wait("write", time.perf_counter() - start)
+            tx = _Transaction(self)
+            token = _current_transaction.set(tx)
+            try:
+                with track("db"):
+                    await self.conn.execute("BEGIN")
+                yield self
+                if tx.error:
+                    # A helper swallowed the failure, don't commit half of it
+                    raise RuntimeError(f"Transaction rolled back: {tx.error}")
+                with track("db"):
+                    await self.conn.commit()
+                # Economy events only for money that really moved
+                for fields in tx.events:
+                    events.emit("economy", **fields)
+            except BaseException:
+                await self.conn.rollback()
+                # Cached rows were written through before commit
+                for user_id in tx.touched_users:
+                    self.invalidate_user(user_id)
+                raise
+            finally:
+                _current_transaction.reset(token)
+    
+    def _emit_economy(self, user_id, balance, amount):
+        """Record a balance change, held back until an open transaction commits"""
+        fields = {"user": user_id, "type": balance, "amount": amount}
+        tx = self._in_transaction()
+        if tx:
+            tx.events.append(fields)
+        else:
+            events.emit("economy", **fields)
+    
+    def _in_transaction(self):
+        """Check if the current task holds a transaction on this database"""
+        current = _current_transaction.get()
+        return current if current is not None and current.db is self else None
+    
+    async def _acquire_reader(self):
+        """Take a reader from the pool, falling back to the writer"""
+        # Inside a transaction, read our own uncommitted writes
+        if not self._read_queue or self._in_transaction():
+            return self.conn
+        
+        start = time.perf_counter()
+        reader = await self._read_queue.get()
+        self._record_wait("read", time.perf_counter() - start)
+        return reader
+    
+    def _release_reader(self, reader):
+        """Return a reader to the pool"""
+        if self._read_queue and reader is not self.conn:
+            self._read_queue.put_nowait(reader)
+    
+    async def _run_write(self, statements, fetch):
+        """Run a statement group on the writer, returning the first row if asked"""
+        row = None
+        for i, (query, params) in enumerate(statements):
+            cursor = await self.conn.execute(query, params)
+            if fetch and i == 0:
+                result = await cursor.fetchone()
+                columns = [description[0] for description in cursor.description]
+                row = dict(zip(columns, result)) if result else None
+            await cursor.close()
+        return row
+    
+    @timed("db")
+    async def _write(self, statements, fetch=False):
+        """
+        Send a statement group down the write lane as one unit
+        
+        Returns (success, row) where row is the first statement's
+        first result row when fetch is set.
+        """
+        tx = self._in_transaction()
+        if tx:
+            # Already holding the writer, no commit until the block ends
+            try:
+                return True, await self._run_write(statements, fetch)
+            except Exception as e:
+                logger.error(f"Execute error: {e}")
+                tx.error = e
+                raise
+        
+        if self._writer_task:
+            # Group commit: wait for the batch holding this write
+            start = time.perf_counter()
+            future = asyncio.get_running_loop().create_future()
+            self._write_queue.put_nowait((statements, fetch, future))
+            result = await future
+            self._record_wait("write", time.perf_counter() - start)
+            return result
+        
+        start = time.perf_counter()
+        async with self._write_lock:
+            self._record_wait("write", time.perf_counter() - start)
+            try:
+                row = await self._run_write(statements, fetch)
+                await self.conn.commit()
+                return True, row
+            except Exception as e:
+                logger.error(f"Execute error: {e}")
+                try:
+                    await self.conn.rollback()
+                except Exception:
+                    pass
+                return False, None
+    
     async def execute(self, query, params=()):
         """Execute a query"""
-        try:
-            await self.conn.execute(query, params)
-            await self.conn.commit()
-            return True
-        except Exception as e:
-            logger.error(f"Execute error: {e}")
-            return False
+        success, _ = await self._write([(query, params)])
+        return success
     
+    @timed("db")
     async def fetch_one(self, query, params=()):
         """Fetch one row"""
+        reader = await self._acquire_reader()
         try:
-            cursor = await self.conn.execute(query, params)
+            cursor = await reader.execute(query, params)
             row = await cursor.fetchone()
             await cursor.close()
             
@@ -155,11 +613,15 @@ class Database:
         except Exception as e:
             logger.error(f"Fetch one error: {e}")
             return None
+        finally:
+            self._release_reader(reader)
     
+    @timed("db")
     async def fetch_all(self, query, params=()):
         """Fetch all rows"""
+        reader = await self._acquire_reader()
         try:
-            cursor = await self.conn.execute(query, params)
+            cursor = await reader.execute(query, params)
             rows = await cursor.fetchall()
             await cursor.close()
             
@@ -170,13 +632,49 @@ class Database:
         except Exception as e:
             logger.error(f"Fetch all error: {e}")
             return []
+        finally:
+            self._release_reader(reader)
     
     async def get_user(self, user_id):
         """Get user by ID"""
-        return await self.fetch_one(
+        cached = self.user_cache.get(user_id)
+        if cached is not None:
+            return dict(cached)
+        
+        writes_before = self._user_writes
+        user = await self.fetch_one(
             "SELECT * FROM users WHERE user_id = ?",
             (user_id,)
         )
+        
+        # Don't cache a row that a concurrent write may have made stale
+        if user and writes_before == self._user_writes:
+            self.user_cache.set(user_id, dict(user))
+        return user
+    
+    def _update_cached_user(self, user_id, deltas=None, values=None):
+        """Apply a successful write to the cached user row"""
+        self._user_writes += 1
+        
+        tx = self._in_transaction()
+        if tx:
+            tx.touched_users.add(user_id)
+        
+        row = self.user_cache.peek(user_id)
+        if row is None:
+            return
+        for column, delta in (deltas or {}).items():
+            row[column] = (row.get(column) or 0) + delta
+        row.update(values or {})
+    
+    def invalidate_user(self, user_id):
+        """Drop a user from the cache after a raw UPDATE"""
+        self._user_writes += 1
+        self.user_cache.pop(user_id)
+    
+    def get_cache_stats(self):
+        """Get user cache hit/miss counters"""
+        return self.user_cache.stats()
     
     async def create_user(self, user_id, username, first_name, last_name=""):
         """Create new user"""
@@ -194,6 +692,7 @@ class Database:
                 (user_id,)
             )
             
+            self.invalidate_user(user_id)
             return await self.get_user(user_id)
         except Exception as e:
             logger.error(f"Create user error: {e}")
@@ -202,43 +701,289 @@ class Database:
     async def update_currency(self, user_id, currency_type, amount):
         """Update user's cash or bank balance"""
         try:
-            if currency_type == "cash":
-                await self.execute(
-                    "UPDATE users SET cash = cash + ? WHERE user_id = ?",
-                    (amount, user_id)
-                )
-            elif currency_type == "bank":
-                await self.execute(
-                    "UPDATE users SET bank_balance = bank_balance + ? WHERE user_id = ?",
-                    (amount, user_id)
-                )
-            return True
+            column = BALANCE_COLUMNS.get(currency_type)
+            if not column:
+                logger.error(f"Update currency error: unknown balance '{currency_type}'")
+                return False
+            
+            success = await self.execute(
+                f"UPDATE users SET {column} = {column} + ? WHERE user_id = ?",
+                (amount, user_id)
+            )
+            if success:
+                self._update_cached_user(user_id, deltas={column: amount})
+                self._emit_economy(user_id, column, amount)
+            return success
         except Exception as e:
             logger.error(f"Update currency error: {e}")
             return False
     
+    async def adjust_balance(self, user_id, deltas, min_balance=0):
+        """
+        Atomically apply balance changes and return the new balances
+        
+        Args:
+            user_id: User to update
+            deltas: Amount per balance, e.g. {"cash": -100, "bank_balance": 100}
+            min_balance: Lowest balance allowed after a debit
+        
+        Returns:
+            {"cash": ..., "bank_balance": ...} after the update, or None if
+            the user doesn't exist or a debit would go below min_balance
+        """
+        columns = {}
+        for currency_type, amount in deltas.items():
+            column = BALANCE_COLUMNS.get(currency_type)
+            if not column:
+                logger.error(f"Adjust balance error: unknown balance '{currency_type}'")
+                return None
+            columns[column] = columns.get(column, 0) + amount
+        
+        set_parts, set_params = [], []
+        where_parts, where_params = [], []
+        for column, amount in columns.items():
+            set_parts.append(f"{column} = {column} + ?")
+            set_params.append(amount)
+            if amount < 0:
+                where_parts.append(f"{column} + ? >= ?")
+                where_params.extend([amount, min_balance])
+        
+        query = f"""UPDATE users SET {', '.join(set_parts)}
+                    WHERE {' AND '.join(['user_id = ?'] + where_parts)}
+                    RETURNING cash, bank_balance"""
+        
+        success, balances = await self._write(
+            [(query, tuple(set_params + [user_id] + where_params))], fetch=True
+        )
+        if not success or not balances:
+            return None
+        
+        self._update_cached_user(user_id, values=balances)
+        for column, amount in columns.items():
+            self._emit_economy(user_id, column, amount)
+        return balances
+    
+    async def bank_transfer(self, user_id, amount, direction):
+        """
+        Move money between cash and bank and append the ledger row
+        
+        The balance update and the transactions insert are written as one
+        unit. Returns the new balances, or None if funds are insufficient.
+        
+        Args:
+            user_id: User making the transfer
+            amount: Positive amount to move
+            direction: "deposit" (cash to bank) or "withdraw" (bank to cash)
+        """
+        if amount <= 0 or direction not in BANK_TRANSFERS:
+            return None
+        
+        source, target, description = BANK_TRANSFERS[direction]
+        statements = [
+            (f"""UPDATE users
+                 SET {source} = {source} - ?, {target} = {target} + ?
+                 WHERE user_id = ? AND {source} >= ?
+                 RETURNING cash, bank_balance""",
+             (amount, amount, user_id, amount)),
+            # Only logged if the update above moved the money
+            ("""INSERT INTO transactions (user_id, type, amount, description, balance_after)
+                SELECT user_id, ?, ?, ?, bank_balance FROM users
+                WHERE user_id = ? AND changes() > 0""",
+             (direction, amount, description, user_id))
+        ]
+        
+        success, balances = await self._write(statements, fetch=True)
+        if not success or not balances:
+            return None
+        
+        self._update_cached_user(user_id, values=balances)
+        self._emit_economy(user_id, direction, amount)
+        return balances
+    
+    async def add_xp(self, user_id, amount):
+        """Add XP to user"""
+        success = await self.execute(
+            "UPDATE users SET xp = xp + ? WHERE user_id = ?",
+            (amount, user_id)
+        )
+        if success:
+            self._update_cached_user(user_id, deltas={"xp": amount})
+        return success
+    
+    async def update_daily_streak(self, user_id, streak):
+        """Set daily streak and stamp last_daily"""
+        success = await self.execute(
+            """UPDATE users 
+               SET daily_streak = ?, last_daily = CURRENT_TIMESTAMP
+               WHERE user_id = ?""",
+            (streak, user_id)
+        )
+        if success:
+            # Same format SQLite uses for CURRENT_TIMESTAMP
+            last_daily = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+            self._update_cached_user(
+                user_id, values={"daily_streak": streak, "last_daily": last_daily}
+            )
+        return success
+    
     async def get_family(self, user_id):
         """Get all family members for a user"""
         query = """
-        SELECT u.user_id, u.username, u.first_name, u.last_name, f.relation
-        FROM family f
-        JOIN users u ON (u.user_id = f.user2_id OR u.user_id = f.user1_id)
-        WHERE (f.user1_id = ? OR f.user2_id = ?) AND u.user_id != ?
+        SELECT u.user_id, u.username, u.first_name, u.last_name, e.relation
+        FROM family_edges e
+        JOIN users u ON u.user_id = e.member_id
+        WHERE e.user_id = ?
+        """
+        return await self.fetch_all(query, (user_id,))
+    
+    async def get_family_tree(self, user_id, depth=None, max_nodes=None):
+        """
+        Get ancestors and descendants of a user in one recursive query
+        
+        Args:
+            user_id: Root of the tree
+            depth: Generations to walk up and down
+            max_nodes: Cap on relatives returned
+        
+        Returns:
+            {
+                "root": user_id,
+                "nodes": {user_id: {"first_name", "username", "generation"}},
+                "children": {parent_id: [child_id, ...]},
+                "truncated": True if max_nodes was hit
+            }
+            Generation is negative for ancestors, positive for descendants.
+        """
+        depth = depth or Config.FAMILY_TREE_MAX_DEPTH
+        max_nodes = max_nodes or Config.FAMILY_TREE_MAX_NODES
+        
+        # path holds visited ids as ",a,b,c," so cycles stop the walk
+        query = """
+        WITH RECURSIVE
+        up(parent_id, child_id, node_id, generation, path) AS (
+            SELECT member_id, user_id, member_id, -1,
+                   ',' || user_id || ',' || member_id || ','
+            FROM family_edges WHERE user_id = ? AND relation = 'parent'
+            UNION ALL
+            SELECT e.member_id, e.user_id, e.member_id, up.generation - 1,
+                   up.path || e.member_id || ','
+            FROM up JOIN family_edges e
+              ON e.user_id = up.parent_id AND e.relation = 'parent'
+            WHERE up.generation > -? AND instr(up.path, ',' || e.member_id || ',') = 0
+            LIMIT ?
+        ),
+        down(parent_id, child_id, node_id, generation, path) AS (
+            SELECT user_id, member_id, member_id, 1,
+                   ',' || user_id || ',' || member_id || ','
+            FROM family_edges WHERE user_id = ? AND relation = 'child'
+            UNION ALL
+            SELECT e.user_id, e.member_id, e.member_id, down.generation + 1,
+                   down.path || e.member_id || ','
+            FROM down JOIN family_edges e
+              ON e.user_id = down.child_id AND e.relation = 'child'
+            WHERE down.generation < ? AND instr(down.path, ',' || e.member_id || ',') = 0
+            LIMIT ?
+        ),
+        links AS (
+            SELECT parent_id, child_id, node_id, generation FROM up
+            UNION ALL
+            SELECT parent_id, child_id, node_id, generation FROM down
+        )
+        SELECT l.parent_id, l.child_id, l.node_id, l.generation, u.first_name, u.username
+        FROM links l
+        LEFT JOIN users u ON u.user_id = l.node_id
+        LIMIT ?
         """
-        return await self.fetch_all(query, (user_id, user_id, user_id))
+        rows = await self.fetch_all(
+            query,
+            (user_id, depth, max_nodes, user_id, depth, max_nodes, max_nodes + 1)
+        )
+        
+        root = await self.get_user(user_id) or {}
+        tree = {
+            "root": user_id,
+            "nodes": {
+                user_id: {
+                    "first_name": root.get('first_name'),
+                    "username": root.get('username'),
+                    "generation": 0
+                }
+            },
+            "children": {},
+            "truncated": len(rows) > max_nodes
+        }
+        
+        for row in rows[:max_nodes]:
+            tree["nodes"].setdefault(row['node_id'], {
+                "first_name": row['first_name'],
+                "username": row['username'],
+                "generation": row['generation']
+            })
+            children = tree["children"].setdefault(row['parent_id'], [])
+            if row['child_id'] not in children:
+                children.append(row['child_id'])
+        
+        return tree
+    
+    async def are_related(self, user_id, member_id, relation=None):
+        """Check if two users share a family edge"""
+        if relation:
+            row = await self.fetch_one(
+                """SELECT 1 FROM family_edges
+                   WHERE user_id = ? AND member_id = ? AND relation = ?""",
+                (user_id, member_id, relation)
+            )
+        else:
+            row = await self.fetch_one(
+                "SELECT 1 FROM family_edges WHERE user_id = ? AND member_id = ? LIMIT 1",
+                (user_id, member_id)
+            )
+        return row is not None
     
     async def add_family_member(self, user1_id, user2_id, relation):
         """Add family relationship"""
         try:
-            await self.execute(
-                "INSERT INTO family (user1_id, user2_id, relation) VALUES (?, ?, ?)",
-                (user1_id, user2_id, relation)
-            )
-            return True
+            inverse = INVERSE_RELATIONS.get(relation, relation)
+            success, _ = await self._write([
+                ("INSERT INTO family (user1_id, user2_id, relation) VALUES (?, ?, ?)",
+                 (user1_id, user2_id, relation)),
+                ("INSERT OR IGNORE INTO family_edges (user_id, member_id, relation) VALUES (?, ?, ?)",
+                 (user1_id, user2_id, relation)),
+                ("INSERT OR IGNORE INTO family_edges (user_id, member_id, relation) VALUES (?, ?, ?)",
+                 (user2_id, user1_id, inverse))
+            ])
+            return success
         except Exception as e:
             logger.error(f"Add family member error: {e}")
             return False
     
+    async def remove_family_member(self, user1_id, user2_id, relation):
+        """Remove a family relationship in both directions"""
+        try:
+            inverse = INVERSE_RELATIONS.get(relation, relation)
+            success, _ = await self._write([
+                ("""DELETE FROM family
+                    WHERE (user1_id = ? AND user2_id = ? AND relation = ?)
+                       OR (user1_id = ? AND user2_id = ? AND relation = ?)""",
+                 (user1_id, user2_id, relation, user2_id, user1_id, inverse)),
+                ("""DELETE FROM family_edges
+                    WHERE (user_id = ? AND member_id = ? AND relation = ?)
+                       OR (user_id = ? AND member_id = ? AND relation = ?)""",
+                 (user1_id, user2_id, relation, user2_id, user1_id, inverse))
+            ])
+            return success
+        except Exception as e:
+            logger.error(f"Remove family member error: {e}")
+            return False
+    
+    async def clear_family(self, user_id):
+        """Remove every family relationship of a user"""
+        success, _ = await self._write([
+            ("DELETE FROM family WHERE user1_id = ? OR user2_id = ?", (user_id, user_id)),
+            ("DELETE FROM family_edges WHERE user_id = ? OR member_id = ?", (user_id, user_id))
+        ])
+        return success
+    
     async def get_garden(self, user_id):
         """Get user's garden info"""
         garden = await self.fetch_one(
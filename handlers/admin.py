@@ -3,6 +3,7 @@
 REAL admin commands only - No fake placeholders
 """
 
+import html
 import logging
 import asyncio
 from datetime import datetime
@@ -17,6 +18,8 @@ from config import Config
 from database import Database
 from utils.logger import log_to_channel
 from utils.helpers import format_money
+from utils.render_cache import render_cache
+from utils.metrics import metrics, PARTS
 
 # Create router
 admin_router = Router()
@@ -50,6 +53,7 @@ async def cmd_admin(message: Message, db: Database):
 
 📈 <b>Statistics:</b>
 /stats - Detailed bot statistics
+/perf [command] - Command latency p50/p95/p99
 
 👥 <b>User Management:</b>
 /ban [id] - Ban user
@@ -101,6 +105,9 @@ async def cmd_stats(message: Message, db: Database):
         
         stats = await db.get_stats()
         user_count = await db.get_user_count()
+        pool = db.get_pool_stats()
+        user_cache = db.get_cache_stats()
+        renders = render_cache.stats()
         
         response = f"""
 📊 <b>BOT STATISTICS</b>
@@ -125,6 +132,16 @@ async def cmd_stats(message: Message, db: Database):
 • Reaction GIFs: {stats.get('gifs_count', 0):,}
 • Total Groups: {stats.get('groups', 0):,}
 
+🗄️ <b>Database Pool:</b>
+• Readers: {pool['read_pool_size']}
+• Read Wait: {pool['read']['avg_wait_ms']}ms avg / {pool['read']['max_wait_ms']}ms max
+• Write Wait: {pool['write']['avg_wait_ms']}ms avg / {pool['write']['max_wait_ms']}ms max
+• Commits: {pool['batches']['count']:,} ({pool['batches']['avg_size']} writes avg)
+• User Cache: {user_cache['hit_rate']}% hits ({user_cache['hits']:,}/{user_cache['hits'] + user_cache['misses']:,}), {user_cache['size']:,} rows
+
+🖼️ <b>Image Cache:</b>
+• Renders: {renders['memory']['hit_rate']}% memory / {renders['disk']['hit_rate']}% disk hits, {renders['disk']['files']:,} files ({renders['disk']['bytes'] // 1024:,} KB)
+
 🔄 <b>Last Updated:</b> {datetime.now().strftime('%H:%M:%S')}
 """
         
@@ -142,6 +159,64 @@ async def cmd_stats(message: Message, db: Database):
         logger.error(f"Stats command error: {e}")
         await message.answer("❌ An error occurred.")
 
+@admin_router.message(Command("perf"))
+async def cmd_perf(message: Message, command: CommandObject):
+    """Command latency percentiles, split by DB / image / API / HTTP time"""
+    try:
+        if not is_admin(message.from_user.id):
+            await message.answer("❌ Admin access required!")
+            return
+        
+        if not metrics.commands:
+            await message.answer("⏱️ No commands timed yet.")
+            return
+        
+        uptime_h = metrics.uptime() / 3600
+        name = (command.args or "").strip().lstrip("/").lower()
+        
+        if name:
+            stats = metrics.commands.get(name)
+            if not stats:
+                await message.answer(f"❌ No timings for /{html.escape(name)}")
+                return
+            
+            lines = [f"{'':<7}{'p50':>8}{'p95':>8}{'p99':>8}{'mean':>8}"]
+            for label, hist in [("total", stats.total)] + [(part, stats.parts[part]) for part in PARTS]:
+                lines.append(
+                    f"{label:<7}{hist.quantile(0.5):>8.1f}{hist.quantile(0.95):>8.1f}"
+                    f"{hist.quantile(0.99):>8.1f}{hist.mean:>8.1f}"
+                )
+            response = (
+                f"⏱️ <b>/{html.escape(name)}</b> — {stats.total.count:,} calls, {stats.errors:,} errors, "
+                f"max {stats.total.max:.0f}ms\n"
+                f"<pre>" + html.escape("\n".join(lines)) + "</pre>\n"
+                f"<i>ms over {uptime_h:.1f}h; parts can overlap when run concurrently</i>"
+            )
+            await message.answer(response, parse_mode="HTML")
+            return
+        
+        lines = [f"{'cmd':<12}{'n':>6}{'err':>4}{'p50':>7}{'p95':>7}{'p99':>7}{'db95':>6}{'img95':>6}{'api95':>6}"]
+        ranked = sorted(metrics.commands.items(), key=lambda item: -item[1].total.count)
+        for cmd, stats in ranked[:25]:
+            total = stats.total
+            lines.append(
+                f"{cmd[:12]:<12}{total.count:>6}{stats.errors:>4}"
+                f"{total.quantile(0.5):>7.0f}{total.quantile(0.95):>7.0f}{total.quantile(0.99):>7.0f}"
+                f"{stats.parts['db'].quantile(0.95):>6.0f}{stats.parts['image'].quantile(0.95):>6.0f}"
+                f"{stats.parts['api'].quantile(0.95):>6.0f}"
+            )
+        
+        response = (
+            f"⏱️ <b>COMMAND LATENCY</b> (ms, last {uptime_h:.1f}h)\n"
+            f"<pre>" + html.escape("\n".join(lines)) + "</pre>\n"
+            f"/perf [command] for the full DB / image / API / HTTP split"
+        )
+        await message.answer(response, parse_mode="HTML")
+        
+    except Exception as e:
+        logger.error(f"Perf command error: {e}")
+        await message.answer("❌ An error occurred.")
+
 @admin_router.message(Command("cat"))
 async def cmd_cat(message: Message, command: CommandObject, db: Database):
     """
@@ -494,6 +569,7 @@ async def cmd_ban(message: Message, command: CommandObject, db: Database):
             "UPDATE users SET is_banned = 1 WHERE user_id = ?",
             (target_id,)
         )
+        db.invalidate_user(target_id)
         
         await message.answer(f"✅ User {target_id} ({user['first_name']}) has been banned.")
         
@@ -538,6 +614,7 @@ async def cmd_unban(message: Message, command: CommandObject, db: Database):
             "UPDATE users SET is_banned = 0 WHERE user_id = ?",
             (target_id,)
         )
+        db.invalidate_user(target_id)
         
         await message.answer(f"✅ User {target_id} ({user['first_name']}) has been unbanned.")
         
@@ -583,6 +660,7 @@ async def cmd_warn(message: Message, db: Database):
             "UPDATE users SET warnings = warnings + 1 WHERE user_id = ?",
             (target_id,)
         )
+        db.invalidate_user(target_id)
         
         warnings = user.get('warnings', 0) + 1
         
@@ -645,42 +723,45 @@ async def cmd_reset(message: Message, command: CommandObject, db: Database):
             await message.answer("❌ User not found!")
             return
         
-        if reset_type == "all":
-            # Reset everything
-            await db.execute("DELETE FROM family WHERE user1_id = ? OR user2_id = ?", (target_id, target_id))
-            await db.execute("DELETE FROM plants WHERE user_id = ?", (target_id,))
-            await db.execute("DELETE FROM barn WHERE user_id = ?", (target_id,))
-            await db.execute("DELETE FROM bank_accounts WHERE user_id = ?", (target_id,))
-            await db.execute("DELETE FROM lottery_tickets WHERE user_id = ?", (target_id,))
-            await db.execute("DELETE FROM businesses WHERE user_id = ?", (target_id,))
-            
-            # Reset user stats
-            await db.execute(
-                """UPDATE users 
-                   SET cash = ?, bank_balance = ?, level = 1, xp = 0, 
-                       daily_streak = 0, warnings = 0
-                   WHERE user_id = ?""",
-                (Config.START_CASH, Config.START_BANK, target_id)
-            )
-            
-            msg = "All data reset"
-            
-        elif reset_type == "cash":
-            await db.execute(
-                "UPDATE users SET cash = ? WHERE user_id = ?",
-                (Config.START_CASH, target_id)
-            )
-            msg = "Cash reset to $1,000"
-            
-        elif reset_type == "garden":
-            await db.execute("DELETE FROM plants WHERE user_id = ?", (target_id,))
-            await db.execute("DELETE FROM barn WHERE user_id = ?", (target_id,))
-            msg = "Garden reset"
-            
-        else:
+        if reset_type not in ("all", "cash", "garden"):
             await message.answer("❌ Invalid type! Use: all, cash, garden")
             return
         
+        async with db.transaction():
+            if reset_type == "all":
+                # Reset everything
+                await db.clear_family(target_id)
+                await db.execute("DELETE FROM plants WHERE user_id = ?", (target_id,))
+                await db.execute("DELETE FROM barn WHERE user_id = ?", (target_id,))
+                await db.execute("DELETE FROM bank_accounts WHERE user_id = ?", (target_id,))
+                await db.execute("DELETE FROM lottery_tickets WHERE user_id = ?", (target_id,))
+                await db.execute("DELETE FROM businesses WHERE user_id = ?", (target_id,))
+                
+                # Reset user stats
+                await db.execute(
+                    """UPDATE users 
+                       SET cash = ?, bank_balance = 0, level = 1, xp = 0, 
+                           daily_streak = 0, warnings = 0
+                       WHERE user_id = ?""",
+                    (Config.STARTING_BALANCE, target_id)
+                )
+                
+                msg = "All data reset"
+                
+            elif reset_type == "cash":
+                await db.execute(
+                    "UPDATE users SET cash = ? WHERE user_id = ?",
+                    (Config.STARTING_BALANCE, target_id)
+                )
+                msg = f"Cash reset to ${Config.STARTING_BALANCE:,}"
+                
+            else:
+                await db.execute("DELETE FROM plants WHERE user_id = ?", (target_id,))
+                await db.execute("DELETE FROM barn WHERE user_id = ?", (target_id,))
+                msg = "Garden reset"
+        
+        db.invalidate_user(target_id)
+        
         await message.answer(f"✅ User {target_id} {msg}.")
         
         # Log reset
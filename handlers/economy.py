@@ -14,9 +14,10 @@ from aiogram.types import Message, CallbackQuery
 from aiogram import F
 
 from config import Config
-from database import Database, image_gen
+from database import Database
+from images import image_gen
 from utils.logger import log_to_channel
-from utils.helpers import format_money, format_time
+from utils.helpers import format_money, format_time, answer_image
 
 # Create router
 economy_router = Router()
@@ -149,25 +150,20 @@ async def cmd_deposit(message: Message, command: CommandObject, db: Database):
             await message.answer(f"❌ You only have ${user['cash']:,} cash!")
             return
         
-        # Deposit
-        await db.update_currency(message.from_user.id, "cash", -amount)
-        await db.update_currency(message.from_user.id, "bank_balance", amount)
-        
-        # Record transaction
-        await db.execute(
-            """INSERT INTO transactions (user_id, type, amount, description, balance_after)
-               VALUES (?, 'deposit', ?, 'Cash deposit', ?)""",
-            (message.from_user.id, amount, user.get('bank_balance', 0) + amount)
-        )
+        # Deposit and record transaction
+        balances = await db.bank_transfer(message.from_user.id, amount, "deposit")
+        if not balances:
+            await message.answer(f"❌ You don't have ${amount:,} cash!")
+            return
         
         response = f"""
 ✅ <b>DEPOSIT SUCCESSFUL!</b>
 
 💰 <b>Amount:</b> ${amount:,}
-🏦 <b>New Bank Balance:</b> ${user.get('bank_balance', 0) + amount:,}
-💵 <b>Cash Left:</b> ${user['cash'] - amount:,}
+🏦 <b>New Bank Balance:</b> ${balances['bank_balance']:,}
+💵 <b>Cash Left:</b> ${balances['cash']:,}
 
-📈 <b>Daily Interest:</b> ${int((user.get('bank_balance', 0) + amount) * (Config.BANK_INTEREST_RATE / 100)):,}
+📈 <b>Daily Interest:</b> ${int(balances['bank_balance'] * (Config.BANK_INTEREST_RATE / 100)):,}
 💡 Use /interest daily to collect!
 """
         
@@ -203,23 +199,18 @@ async def cmd_withdraw(message: Message, command: CommandObject, db: Database):
             await message.answer(f"❌ You only have ${user.get('bank_balance', 0):,} in bank!")
             return
         
-        # Withdraw
-        await db.update_currency(message.from_user.id, "bank_balance", -amount)
-        await db.update_currency(message.from_user.id, "cash", amount)
-        
-        # Record transaction
-        await db.execute(
-            """INSERT INTO transactions (user_id, type, amount, description, balance_after)
-               VALUES (?, 'withdraw', ?, 'Cash withdrawal', ?)""",
-            (message.from_user.id, amount, user.get('bank_balance', 0) - amount)
-        )
+        # Withdraw and record transaction
+        balances = await db.bank_transfer(message.from_user.id, amount, "withdraw")
+        if not balances:
+            await message.answer(f"❌ You don't have ${amount:,} in bank!")
+            return
         
         response = f"""
 ✅ <b>WITHDRAWAL SUCCESSFUL!</b>
 
 💰 <b>Amount:</b> ${amount:,}
-🏦 <b>New Bank Balance:</b> ${user.get('bank_balance', 0) - amount:,}
-💵 <b>Cash Now:</b> ${user['cash'] + amount:,}
+🏦 <b>New Bank Balance:</b> ${balances['bank_balance']:,}
+💵 <b>Cash Now:</b> ${balances['cash']:,}
 
 💡 Your money is ready to use!
 """
@@ -380,7 +371,9 @@ async def cmd_garden(message: Message, db: Database):
         plants = await db.get_plants(message.from_user.id)
         
         # Create garden image
-        image_bytes = image_gen.create_garden_image(user['first_name'], plants, garden_info)
+        image = await image_gen.render(
+            "create_garden_image", user['first_name'], plants, garden_info
+        )
         
         # Calculate stats
         ready_count = sum(1 for p in plants if p.get('current_progress', 0) >= 100)
@@ -415,15 +408,9 @@ async def cmd_garden(message: Message, db: Database):
                 emoji = CROP_DATA.get(plant.get('crop_type', ''), {}).get('emoji', '🌱')
                 caption += f"{emoji} {plant['crop_type'].title()}: {int(progress)}%\n"
         
-        if image_bytes:
+        if image:
             try:
-                from aiogram.types import BufferedInputFile
-                photo = BufferedInputFile(image_bytes, filename="garden.png")
-                await message.answer_photo(
-                    photo=photo,
-                    caption=caption,
-                    parse_mode="HTML"
-                )
+                await answer_image(message, image, "garden", caption)
             except Exception as e:
                 logger.error(f"Garden photo error: {e}")
                 await message.answer(caption, parse_mode="HTML")
@@ -509,15 +496,22 @@ Use /garden to check available space
         # Plant crops
         grow_time = crop_data['grow_time']
         
-        for _ in range(quantity):
-            await db.execute(
-                """INSERT INTO plants (user_id, crop_type, grow_time)
-                   VALUES (?, ?, ?)""",
-                (message.from_user.id, crop_type, grow_time)
-            )
-        
-        # Deduct money
-        await db.update_currency(message.from_user.id, "cash", -total_cost)
+        async with db.transaction():
+            # Deduct money
+            balances = await db.adjust_balance(message.from_user.id, {"cash": -total_cost})
+            
+            # Reply after the block so the writer isn't held across a network call
+            if balances:
+                for _ in range(quantity):
+                    await db.execute(
+                        """INSERT INTO plants (user_id, crop_type, grow_time)
+                           VALUES (?, ?, ?)""",
+                        (message.from_user.id, crop_type, grow_time)
+                    )
+        
+        if not balances:
+            await message.answer(f"❌ You need ${total_cost:,}!")
+            return
         
         response = f"""
 ✅ <b>PLANTED SUCCESSFULLY!</b>
@@ -525,6 +519,7 @@ Use /garden to check available space
 {crop_data['emoji']} <b>Crop:</b> {crop_type.title()}
 🔢 <b>Quantity:</b> {quantity}
 💰 <b>Cost:</b> ${total_cost:,}
+💵 <b>Cash Left:</b> ${balances['cash']:,}
 ⏰ <b>Grow Time:</b> {grow_time} hours
 ⭐ <b>XP per crop:</b> {crop_data['xp']}
 
@@ -565,48 +560,48 @@ async def cmd_harvest(message: Message, db: Database):
         total_xp = 0
         harvest_text = "✅ <b>HARVEST COMPLETE!</b>\n\n"
         
-        for plant in ready_plants:
-            crop_type = plant['crop_type']
-            count = plant['count']
-            
-            if crop_type in CROP_DATA:
-                crop_data = CROP_DATA[crop_type]
-                sell_price = crop_data['sell'] * count
-                crop_xp = crop_data['xp'] * count
-                total_value += sell_price
-                total_xp += crop_xp
-                
-                # Add to barn
-                await db.execute(
-                    """INSERT INTO barn (user_id, crop_type, quantity)
-                       VALUES (?, ?, ?)
-                       ON CONFLICT(user_id, crop_type) 
-                       DO UPDATE SET quantity = quantity + ?""",
-                    (message.from_user.id, crop_type, count, count)
-                )
+        async with db.transaction():
+            for plant in ready_plants:
+                crop_type = plant['crop_type']
+                count = plant['count']
                 
-                harvest_text += f"{crop_data['emoji']} {crop_type.title()}: {count} × ${crop_data['sell']} = ${sell_price}\n"
-        
-        # Remove harvested plants
-        await db.execute(
-            "DELETE FROM plants WHERE user_id = ? AND is_ready = 0",
-            (message.from_user.id,)
-        )
-        
-        # Add money and XP
-        if total_value > 0:
-            await db.update_currency(message.from_user.id, "cash", total_value)
-        
-        harvest_text += f"\n💰 <b>Total Earned: ${total_value:,}</b>"
-        harvest_text += f"\n💵 New Balance: ${user['cash'] + total_value:,}"
-        
-        if total_xp > 0:
-            # Add XP
+                if crop_type in CROP_DATA:
+                    crop_data = CROP_DATA[crop_type]
+                    sell_price = crop_data['sell'] * count
+                    crop_xp = crop_data['xp'] * count
+                    total_value += sell_price
+                    total_xp += crop_xp
+                    
+                    # Add to barn
+                    await db.execute(
+                        """INSERT INTO barn (user_id, crop_type, quantity)
+                           VALUES (?, ?, ?)
+                           ON CONFLICT(user_id, crop_type) 
+                           DO UPDATE SET quantity = quantity + ?""",
+                        (message.from_user.id, crop_type, count, count)
+                    )
+                    
+                    harvest_text += f"{crop_data['emoji']} {crop_type.title()}: {count} × ${crop_data['sell']} = ${sell_price}\n"
+            
+            # Remove harvested plants
             await db.execute(
-                "UPDATE users SET xp = xp + ? WHERE user_id = ?",
-                (total_xp, message.from_user.id)
+                "DELETE FROM plants WHERE user_id = ? AND is_ready = 0",
+                (message.from_user.id,)
             )
-            harvest_text += f"\n⭐ <b>XP Gained:</b> {total_xp}"
+            
+            # Add money and XP
+            balances = await db.adjust_balance(message.from_user.id, {"cash": total_value})
+            if not balances:
+                # Roll back the harvest instead of losing the crops
+                raise RuntimeError("Harvest payout failed")
+            
+            harvest_text += f"\n💰 <b>Total Earned: ${total_value:,}</b>"
+            harvest_text += f"\n💵 New Balance: ${balances['cash']:,}"
+            
+            if total_xp > 0:
+                # Add XP
+                await db.add_xp(message.from_user.id, total_xp)
+                harvest_text += f"\n⭐ <b>XP Gained:</b> {total_xp}"
         
         await message.answer(harvest_text, parse_mode="HTML")
         
@@ -8,6 +8,7 @@ FAMILY COMMAND HANDLERS
 Complete with profile pictures and family tree images
 """
 
+import asyncio
 import logging
 import random
 from typing import Optional
@@ -23,7 +24,7 @@ from config import Config
 from database import Database
 from images import image_gen
 from utils.logger import log_to_channel
-from utils.helpers import get_target_user, format_money, format_time, check_cooldown, set_cooldown
+from utils.helpers import get_target_user, format_money, format_time, check_cooldown, set_cooldown, answer_image
 
 # Create router
 family_router = Router()
@@ -195,6 +196,11 @@ async def cmd_me(message: Message, db: Database, bot: Bot):
             await message.answer("Please use /start first!")
             return
         
+        # Start the avatar download while we read the database
+        avatar_task = asyncio.create_task(
+            image_gen.get_avatar(bot, message.from_user.id)
+        )
+        
         # Get user achievements
         achievements = await db.get_achievements(message.from_user.id)
         
@@ -206,11 +212,13 @@ async def cmd_me(message: Message, db: Database, bot: Bot):
         plants = await db.get_plants(message.from_user.id)
         
         # Create profile image WITH profile picture
-        image_bytes = image_gen.create_profile_card(
-            bot=bot,
-            user_data=user_data,
-            achievements=achievements,
-            family=family[:4]  # Show first 4 family members
+        avatar = await avatar_task
+        image = await image_gen.render(
+            "create_profile_card",
+            user_data,
+            achievements,
+            family[:4],  # Show first 4 family members
+            avatar
         )
         
         # Calculate total wealth
@@ -237,15 +245,9 @@ async def cmd_me(message: Message, db: Database, bot: Bot):
 Use /family for detailed family tree
 """
         
-        if image_bytes:
+        if image:
             try:
-                from aiogram.types import BufferedInputFile
-                photo = BufferedInputFile(image_bytes, filename="profile.png")
-                await message.answer_photo(
-                    photo=photo,
-                    caption=caption,
-                    parse_mode="HTML"
-                )
+                await answer_image(message, image, "profile", caption)
             except Exception as e:
                 logger.error(f"Profile photo error: {e}")
                 await message.answer(caption, parse_mode="HTML")
@@ -287,8 +289,12 @@ async def cmd_family(message: Message, db: Database):
             await message.answer(response, parse_mode="HTML")
             return
         
+        # Extended tree: ancestors and descendants beyond direct relations
+        tree = await db.get_family_tree(message.from_user.id)
+        generations = [node['generation'] for node in tree['nodes'].values()]
+        
         # Try to create family tree image
-        image_bytes = image_gen.create_family_tree_image(user_data, family)
+        image = await image_gen.render("create_family_tree_image", user_data, family)
         
         # Build family tree text
         tree_text = f"**Family Tree of {user_data['first_name']}**\n\n"
@@ -303,6 +309,9 @@ async def cmd_family(message: Message, db: Database):
 • Members: {len(family)}
 • Spouses: {sum(1 for m in family if m['relation'] == 'spouse')}
 • Children: {sum(1 for m in family if m['relation'] == 'child')}
+• Ancestors: {sum(1 for g in generations if g < 0)}{"+" if tree['truncated'] else ""}
+• Descendants: {sum(1 for g in generations if g > 0)}{"+" if tree['truncated'] else ""}
+• Generations: {max(generations) - min(generations) + 1}
 • Daily Bonus: +${len(family) * Config.FAMILY_DAILY_BONUS}
 
 **Commands:**
@@ -311,15 +320,9 @@ async def cmd_family(message: Message, db: Database):
 • /divorce - End marriage
 """
         
-        if image_bytes:
+        if image:
             try:
-                from aiogram.types import BufferedInputFile
-                photo = BufferedInputFile(image_bytes, filename="family_tree.png")
-                await message.answer_photo(
-                    photo=photo,
-                    caption=tree_text + stats_text,
-                    parse_mode="HTML"
-                )
+                await answer_image(message, image, "family_tree", tree_text + stats_text)
             except Exception as e:
                 logger.error(f"Family tree image error: {e}")
                 await message.answer(tree_text + stats_text, parse_mode="HTML")
@@ -357,14 +360,7 @@ async def cmd_adopt(message: Message, db: Database):
             return
         
         # Check if already family
-        existing = await db.fetch_one(
-            """SELECT 1 FROM family 
-               WHERE (user1_id = ? AND user2_id = ?) 
-               OR (user1_id = ? AND user2_id = ?)""",
-            (message.from_user.id, target.id, target.id, message.from_user.id)
-        )
-        
-        if existing:
+        if await db.are_related(message.from_user.id, target.id):
             await message.answer("Already family members!")
             return
         
@@ -435,14 +431,7 @@ async def cmd_marry(message: Message, db: Database):
             return
         
         # Check if already married
-        existing = await db.fetch_one(
-            """SELECT 1 FROM family 
-               WHERE ((user1_id = ? AND user2_id = ?) OR (user1_id = ? AND user2_id = ?))
-               AND relation = 'spouse'""",
-            (message.from_user.id, target.id, target.id, message.from_user.id)
-        )
-        
-        if existing:
+        if await db.are_related(message.from_user.id, target.id, "spouse"):
             await message.answer("Already married!")
             return
         
@@ -507,24 +496,12 @@ async def cmd_divorce(message: Message, db: Database):
             return
         
         # Check if married
-        existing = await db.fetch_one(
-            """SELECT 1 FROM family 
-               WHERE ((user1_id = ? AND user2_id = ?) OR (user1_id = ? AND user2_id = ?))
-               AND relation = 'spouse'""",
-            (message.from_user.id, target.id, target.id, message.from_user.id)
-        )
-        
-        if not existing:
+        if not await db.are_related(message.from_user.id, target.id, "spouse"):
             await message.answer("You are not married to this person!")
             return
         
         # Remove marriage
-        await db.execute(
-            """DELETE FROM family 
-               WHERE ((user1_id = ? AND user2_id = ?) OR (user1_id = ? AND user2_id = ?))
-               AND relation = 'spouse'""",
-            (message.from_user.id, target.id, target.id, message.from_user.id)
-        )
+        await db.remove_family_member(message.from_user.id, target.id, "spouse")
         
         response = f"""
 **DIVORCE COMPLETE**
@@ -577,19 +554,15 @@ async def cmd_daily(message: Message, db: Database):
         
         total_bonus = (base_bonus + family_bonus + streak_bonus) * bio_multiplier
         
-        # Give bonus
-        await db.update_currency(message.from_user.id, "cash", total_bonus)
-        
-        # Update streak
-        await db.execute(
-            """UPDATE users 
-               SET daily_streak = ?, last_daily = CURRENT_TIMESTAMP
-               WHERE user_id = ?""",
-            (streak, message.from_user.id)
-        )
-        
-        # Set cooldown
-        await set_cooldown(message.from_user.id, "daily", db)
+        async with db.transaction():
+            # Give bonus
+            balances = await db.adjust_balance(message.from_user.id, {"cash": total_bonus})
+            
+            # Update streak
+            await db.update_daily_streak(message.from_user.id, streak)
+            
+            # Set cooldown
+            await set_cooldown(message.from_user.id, "daily", db)
         
         # Give random gemstone
         gemstones = ["💎 Diamond", "🔴 Ruby", "🔵 Sapphire", "🟢 Emerald", "🟣 Amethyst"]
@@ -607,7 +580,7 @@ async def cmd_daily(message: Message, db: Database):
 **Total: ${total_bonus:,}**
 
 {gemstone} You found a {gemstone}!
-New Balance: ${user.get('cash', 0) + total_bonus:,}
+New Balance: ${balances['cash']:,}
 
 {"Bio verified (2x bonus!)" if bio_multiplier > 1 else "Add me to bio for 2x bonus!"}
 """
@@ -680,7 +653,8 @@ async def cmd_garden(message: Message, db: Database):
         plants = await db.get_plants(message.from_user.id)
         
         # Create garden image
-        image_bytes = image_gen.create_garden_image(
+        image = await image_gen.render(
+            "create_garden_image",
             user['first_name'], 
             plants, 
             garden_info
@@ -719,15 +693,9 @@ async def cmd_garden(message: Message, db: Database):
                 emoji = CROP_DATA.get(plant.get('crop_type', ''), {}).get('emoji', '🌱')
                 caption += f"{emoji} {plant['crop_type'].title()}: {int(progress)}%\n"
         
-        if image_bytes:
+        if image:
             try:
-                from aiogram.types import BufferedInputFile
-                photo = BufferedInputFile(image_bytes, filename="garden.png")
-                await message.answer_photo(
-                    photo=photo,
-                    caption=caption,
-                    parse_mode="HTML"
-                )
+                await answer_image(message, image, "garden", caption)
             except Exception as e:
                 logger.error(f"Garden photo error: {e}")
                 await message.answer(caption, parse_mode="HTML")
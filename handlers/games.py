@@ -15,9 +15,10 @@ from aiogram.types import Message, CallbackQuery
 from aiogram import F
 
 from config import Config
-from database import Database, image_gen
+from database import Database
+from images import image_gen
 from utils.logger import log_to_channel
-from utils.helpers import format_money, format_time
+from utils.helpers import format_money, format_time, answer_image
 
 # Create router
 games_router = Router()
@@ -82,32 +83,38 @@ async def cmd_buyticket(message: Message, command: CommandObject, db: Database):
             await message.answer(f"❌ You need ${total_cost:,}! You have ${user['cash']:,}")
             return
         
-        # Generate tickets
         tickets = []
-        for _ in range(quantity):
-            ticket_id = f"LOT-{random.randint(100000, 999999)}"
-            numbers = ''.join(str(random.randint(0, 9)) for _ in range(6))
+        async with db.transaction():
+            # Deduct money
+            balances = await db.adjust_balance(message.from_user.id, {"cash": -total_cost})
             
-            await db.execute(
-                """INSERT INTO lottery_tickets (ticket_id, user_id, numbers)
-                   VALUES (?, ?, ?)""",
-                (ticket_id, message.from_user.id, numbers)
-            )
-            
-            tickets.append(ticket_id)
-        
-        # Deduct money
-        await db.update_currency(message.from_user.id, "cash", -total_cost)
+            # Generate tickets (reply after the block so the writer isn't held)
+            if balances:
+                for _ in range(quantity):
+                    ticket_id = f"LOT-{random.randint(100000, 999999)}"
+                    numbers = ''.join(str(random.randint(0, 9)) for _ in range(6))
+                    
+                    await db.execute(
+                        """INSERT INTO lottery_tickets (ticket_id, user_id, numbers)
+                           VALUES (?, ?, ?)""",
+                        (ticket_id, message.from_user.id, numbers)
+                    )
+                    
+                    tickets.append(ticket_id)
+        
+        if not balances:
+            await message.answer(f"❌ You need ${total_cost:,}!")
+            return
         
         # Create scratch card image for first ticket
-        if tickets:
-            image_bytes = image_gen.create_scratch_card(tickets[0], numbers)
+        image = await image_gen.render("create_scratch_card", tickets[0], numbers)
         
         response = f"""
 ✅ <b>TICKETS PURCHASED!</b>
 
 🎫 <b>Quantity:</b> {quantity} tickets
 💰 <b>Cost:</b> ${total_cost:,}
+💵 <b>Cash Left:</b> ${balances['cash']:,}
 📝 <b>Ticket IDs:</b> {', '.join(tickets[:3])}
 {"..." if len(tickets) > 3 else ""}
 
@@ -120,15 +127,9 @@ async def cmd_buyticket(message: Message, command: CommandObject, db: Database):
 🎲 Good luck!
 """
         
-        if tickets and image_bytes:
+        if image:
             try:
-                from aiogram.types import BufferedInputFile
-                photo = BufferedInputFile(image_bytes, filename="ticket.png")
-                await message.answer_photo(
-                    photo=photo,
-                    caption=response,
-                    parse_mode="HTML"
-                )
+                await answer_image(message, image, "ticket", response)
             except Exception as e:
                 logger.error(f"Ticket image error: {e}")
                 await message.answer(response, parse_mode="HTML")
@@ -344,7 +345,10 @@ async def cmd_slot(message: Message, command: CommandObject, db: Database):
         net = winnings - bet
         
         # Update money
-        await db.update_currency(message.from_user.id, "cash", net)
+        balances = await db.adjust_balance(message.from_user.id, {"cash": net})
+        if not balances:
+            await message.answer(f"❌ You need ${bet:,} to play!")
+            return
         
         # Slot display
         slot_display = f"""
@@ -362,7 +366,7 @@ async def cmd_slot(message: Message, command: CommandObject, db: Database):
 🏆 <b>Winnings:</b> ${winnings:,}
 📈 <b>Net:</b> {'+' if net > 0 else ''}${net:,}
 
-💵 New Balance: ${user['cash'] + net:,}
+💵 New Balance: ${balances['cash']:,}
 """
             
             if multiplier >= 3:
@@ -372,7 +376,7 @@ async def cmd_slot(message: Message, command: CommandObject, db: Database):
 💔 <b>No win this time</b>
 📉 <b>Loss:</b> -${bet:,}
 
-💵 New Balance: ${user['cash'] - bet:,}
+💵 New Balance: ${balances['cash']:,}
 """
         
         slot_display += "\n🎮 Play again: /slot [bet]"
@@ -440,8 +444,13 @@ async def cmd_dice(message: Message, command: CommandObject, db: Database):
             net = 0
         
         # Update money
+        balance = user['cash']
         if net != 0:
-            await db.update_currency(message.from_user.id, "cash", net)
+            balances = await db.adjust_balance(message.from_user.id, {"cash": net})
+            if not balances:
+                await message.answer(f"❌ You need ${bet:,} to play!")
+                return
+            balance = balances['cash']
         
         # Dice display
         dice_display = f"""
@@ -460,21 +469,21 @@ async def cmd_dice(message: Message, command: CommandObject, db: Database):
 🎁 <b>Winnings:</b> ${winnings:,}
 💰 <b>Profit:</b> +${bet:,}
 
-💵 New Balance: ${user['cash'] + bet:,}
+💵 New Balance: ${balance:,}
 """
         elif result == "LOSE":
             dice_display += f"""
 ❌ <b>YOU LOSE</b>
 💸 <b>Loss:</b> -${bet:,}
 
-💵 New Balance: ${user['cash'] - bet:,}
+💵 New Balance: ${balance:,}
 """
         else:
             dice_display += f"""
 🤝 <b>DRAW!</b>
 💰 <b>Bet returned</b>
 
-💵 Balance unchanged: ${user['cash']:,}
+💵 Balance unchanged: ${balance:,}
 """
         
         dice_display += "\n🎮 Play again: /dice [bet]"
@@ -4,40 +4,213 @@ With profile pictures and font fallbacks for Railway
 """
 
 import io
+import os
+import asyncio
 import logging
+import multiprocessing
 import random
+from functools import lru_cache
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
 from typing import Optional, List, Dict, Any, Tuple
-import aiohttp
 
 try:
-    from PIL import Image, ImageDraw, ImageFont, ImageFilter
+    from PIL import Image, ImageDraw, ImageFont, ImageFilter, ImageOps
     HAS_PILLOW = True
 except ImportError:
     HAS_PILLOW = False
     logging.warning("Pillow not installed. Image generation disabled.")
 
 from config import Config
+from utils.avatars import avatar_cache, AVATAR_SIZE, AVATAR_BYTES
+from utils.emoji import emoji_renderer
+from utils.http import http_client
+from utils.metrics import timed, track
+from utils.render_cache import CACHED_TEMPLATES, RenderedImage, render_cache, render_key
 
 logger = logging.getLogger(__name__)
 
+# Emoji per family relation (as seen from the card owner)
+RELATION_EMOJIS = {"spouse": "💑", "child": "👶", "parent": "👴"}
+
+# Font role -> (size, bold)
+FONT_SIZES = {
+    'small': (14, False),
+    'medium': (18, False),
+    'large': (32, False),
+    'title': (28, True)
+}
+
+# Searched after Config.FONTS_DIR (fonts-dejavu-core in the Docker image)
+SYSTEM_FONT_DIRS = [
+    "/usr/share/fonts/truetype/dejavu",
+    "/usr/share/fonts/dejavu",
+    "/usr/share/fonts/TTF"
+]
+
+@lru_cache(maxsize=None)
+def load_font(size: int, bold: bool = False):
+    """Load a TrueType font once per process, falling back to Pillow's default"""
+    filename = Config.FONT_BOLD if bold else Config.FONT_REGULAR
+    for font_dir in [Config.FONTS_DIR] + SYSTEM_FONT_DIRS:
+        path = os.path.join(font_dir, filename)
+        if os.path.exists(path):
+            try:
+                return ImageFont.truetype(path, size)
+            except OSError as e:
+                logger.warning(f"Font load error {path}: {e}")
+    
+    try:
+        # Pillow >= 10.1 ships a scalable default font
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        return ImageFont.load_default()
+
+@lru_cache(maxsize=4096)
+def _text_width(text: str, size: int, bold: bool) -> int:
+    return emoji_renderer.text_width(text, load_font(size, bold))
+
+# Profile card stat boxes: label and box color, in grid order
+PROFILE_STATS = [
+    ("💰 Cash", "#00b894"),
+    ("🏦 Bank", "#0984e3"),
+    ("⭐ Level", "#fd79a8"),
+    ("🔥 Streak", "#fdcb6e")
+]
+
+# Scratch texture: 300x80 area of 4px squares on a 5px pitch
+SCRATCH_SIZE = (300, 80)
+SCRATCH_CELL = 5
+SCRATCH_PALETTE = [233, 196, 106, 244, 162, 97, 231, 111, 81]  # e9c46a, f4a261, e76f51
+
+# Garden grid geometry (3x3)
+GARDEN_GRID = 3
+GARDEN_CELL = 100
+GARDEN_PADDING = 20
+
+def _init_render_worker():
+    """Pool worker setup: log warnings to stderr, never to the bot's log files"""
+    logging.basicConfig(
+        level=logging.WARNING,
+        format="%(asctime)s - render-worker - %(name)s - %(levelname)s - %(message)s"
+    )
+
+def _render_in_worker(method: str, args: tuple, kwargs: dict) -> Optional[bytes]:
+    """Run an ImageGenerator method inside a pool worker"""
+    return getattr(image_gen, method)(*args, **kwargs)
+
 class ImageGenerator:
     """Professional image generator with profile pictures"""
     
     def __init__(self):
         self.fonts = {}
+        self._executor = None
+        self._pending = 0
+        self._bases = {}
         if HAS_PILLOW:
             self.load_fonts()
     
+    def start_pool(self):
+        """Start the rendering worker pool"""
+        if self._executor or not HAS_PILLOW:
+            return
+        
+        if Config.IMAGE_EXECUTOR == "thread":
+            self._executor = ThreadPoolExecutor(
+                max_workers=Config.IMAGE_WORKERS, thread_name_prefix="render"
+            )
+        else:
+            # spawn: don't fork the event loop and database threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=Config.IMAGE_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_render_worker
+            )
+        logger.info(f"✅ Render pool started: {Config.IMAGE_WORKERS} {Config.IMAGE_EXECUTOR} workers")
+    
+    def shutdown_pool(self):
+        """Stop the rendering worker pool"""
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            logger.info("✅ Render pool stopped")
+    
+    def _render_done(self, loop):
+        """Release a queue slot once a worker finishes"""
+        try:
+            loop.call_soon_threadsafe(self._release_slot)
+        except RuntimeError:
+            # Loop already closed during shutdown
+            pass
+    
+    @property
+    def pending(self) -> int:
+        """Renders queued or running in the pool"""
+        return self._pending
+    
+    def _release_slot(self):
+        self._pending -= 1
+    
+    @timed("image")
+    async def render(self, method: str, *args, **kwargs) -> Optional[RenderedImage]:
+        """
+        Run a create_* method in the worker pool without blocking the loop
+        
+        Returns None (text fallback) if the queue is full, the render
+        times out or fails. Deterministic templates are served from the
+        render cache when their inputs are unchanged.
+        """
+        if not HAS_PILLOW:
+            return None
+        
+        if method not in CACHED_TEMPLATES:
+            image_bytes = await self._render_in_pool(method, args, kwargs)
+            return RenderedImage(None, image_bytes) if image_bytes else None
+        
+        key = render_key(method, args, kwargs)
+        image_bytes = await render_cache.get(key)
+        if image_bytes is None:
+            image_bytes = await self._render_in_pool(method, args, kwargs)
+            if not image_bytes:
+                return None
+            await render_cache.set(key, image_bytes)
+        return RenderedImage(key, image_bytes)
+    
+    async def _render_in_pool(self, method: str, args: tuple, kwargs: dict) -> Optional[bytes]:
+        if not self._executor:
+            self.start_pool()
+        
+        if self._pending >= Config.IMAGE_QUEUE_DEPTH:
+            logger.warning(f"Render queue full ({self._pending}), skipping {method}")
+            return None
+        
+        loop = asyncio.get_running_loop()
+        job = self._executor.submit(_render_in_worker, method, args, kwargs)
+        self._pending += 1
+        # Slot stays taken until the worker really finishes, even after a timeout
+        job.add_done_callback(lambda _: self._render_done(loop))
+        
+        try:
+            return await asyncio.wait_for(
+                asyncio.wrap_future(job), Config.IMAGE_RENDER_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"Render timeout: {method}")
+            return None
+        except BrokenExecutor as e:
+            # A worker died; the next render starts a fresh pool
+            logger.error(f"Render pool broken: {e}")
+            self.shutdown_pool()
+            return None
+        except Exception as e:
+            logger.error(f"Render error in {method}: {e}")
+            return None
+    
     def load_fonts(self):
         """Load fonts with fallbacks - FIXED FOR RAILWAY"""
         try:
-            # Always available in Python
-            self.fonts['small'] = ImageFont.load_default()
-            self.fonts['medium'] = ImageFont.load_default()
-            self.fonts['large'] = ImageFont.load_default()
-            self.fonts['title'] = ImageFont.load_default()
-            logger.info("✅ Using default fonts (Railway compatible)")
+            for role, (size, bold) in FONT_SIZES.items():
+                self.fonts[role] = load_font(size, bold)
             
         except Exception as e:
             logger.warning(f"Font loading: {e}")
@@ -47,27 +220,87 @@ class ImageGenerator:
             self.fonts['large'] = None
             self.fonts['title'] = None
     
-    async def download_profile_pic(self, bot, user_id: int) -> Optional[bytes]:
-        """Download user's profile picture"""
+    async def get_avatar(self, bot, user_id: int) -> Optional[bytes]:
+        """Get the user's prepared avatar (raw 100x100 RGBA), cached on disk"""
         try:
+            return await asyncio.wait_for(
+                self._get_avatar(bot, user_id), Config.AVATAR_FETCH_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"Profile pic download timeout: {user_id}")
+            return None
+        except Exception as e:
+            logger.error(f"Profile pic error: {e}")
+            return None
+    
+    async def _get_avatar(self, bot, user_id: int) -> Optional[bytes]:
+        # Photo id is only revalidated with the Bot API after AVATAR_REVALIDATE_TTL
+        photo_ids = avatar_cache.lookup_user(user_id)
+        if photo_ids is None:
             photos = await bot.get_user_profile_photos(user_id, limit=1)
             if photos.total_count > 0:
-                # Get the largest photo
-                photo = photos.photos[0][-1]
-                file = await bot.get_file(photo.file_id)
-                file_path = file.file_path
-                
-                # Download photo
-                async with aiohttp.ClientSession() as session:
-                    url = f"https://api.telegram.org/file/bot{Config.BOT_TOKEN}/{file_path}"
-                    async with session.get(url) as response:
-                        if response.status == 200:
-                            return await response.read()
+                photo = self.pick_photo_size(photos.photos[0])
+                photo_ids = (photo.file_unique_id, photo.file_id)
+            else:
+                photo_ids = ("", "")
+            avatar_cache.remember_user(user_id, *photo_ids)
+        
+        unique_id, file_id = photo_ids
+        if not unique_id:
+            return None
+        
+        avatar = await avatar_cache.load(unique_id)
+        if avatar:
+            return avatar
+        
+        # Miss: download once, decode and crop in the render pool
+        data = await self.download_profile_pic(bot, file_id)
+        if not data:
             return None
+        
+        with track("image"):
+            avatar = await self._render_in_pool("prepare_avatar", (data,), {})
+        if avatar:
+            await avatar_cache.store(unique_id, avatar)
+        return avatar
+    
+    def pick_photo_size(self, sizes: List[Any]) -> Any:
+        """Smallest photo size that still covers the avatar"""
+        for size in sizes:
+            if min(size.width, size.height) >= AVATAR_SIZE:
+                return size
+        return sizes[-1]
+    
+    async def download_profile_pic(self, bot, file_id: str) -> Optional[bytes]:
+        """Download a profile picture file"""
+        try:
+            file = await bot.get_file(file_id)
+            file_path = file.file_path
+            
+            # Download photo over the shared keep-alive session
+            url = f"https://api.telegram.org/file/bot{Config.BOT_TOKEN}/{file_path}"
+            return await http_client.get_bytes(url)
         except Exception as e:
             logger.error(f"Profile pic download error: {e}")
             return None
     
+    def prepare_avatar(self, data: bytes) -> Optional[bytes]:
+        """Decode, crop and mask a profile picture into raw RGBA bytes"""
+        if not HAS_PILLOW:
+            return None
+        
+        try:
+            pic = Image.open(io.BytesIO(data))
+            pic.draft('RGB', (AVATAR_SIZE, AVATAR_SIZE))
+            pic = ImageOps.fit(pic.convert('RGB'), (AVATAR_SIZE, AVATAR_SIZE))
+            
+            circular_pic = Image.new('RGBA', (AVATAR_SIZE, AVATAR_SIZE), (0, 0, 0, 0))
+            circular_pic.paste(pic, (0, 0), self.create_circular_mask(AVATAR_SIZE))
+            return circular_pic.tobytes()
+        except Exception as e:
+            logger.warning(f"Profile pic decode error: {e}")
+            return None
+    
     def create_circular_mask(self, size: int) -> Image.Image:
         """Create circular mask for profile pictures"""
         mask = Image.new('L', (size, size), 0)
@@ -75,100 +308,211 @@ class ImageGenerator:
         draw.ellipse((0, 0, size, size), fill=255)
         return mask
     
-    def create_profile_card(self, bot, user_data: Dict, achievements: List[Dict], 
-                          family: List[Dict] = None) -> Optional[bytes]:
-        """Create profile card with profile picture"""
+    def encode(self, img: Image.Image, template: str) -> bytes:
+        """Encode a finished image with the template's profile from Config"""
+        profile = Config.IMAGE_ENCODING.get(template, Config.IMAGE_ENCODING['default'])
+        fmt = profile.get('format', 'PNG').upper()
+        fast = Config.IMAGE_FAST_ENCODE
+        
+        if fmt == 'PNG':
+            options = {
+                'compress_level': 1 if fast else profile.get('compress_level', 6),
+                'optimize': profile.get('optimize', False) and not fast
+            }
+        elif fmt == 'WEBP':
+            options = {
+                'quality': profile.get('quality', 85),
+                'method': 0 if fast else profile.get('method', 4)
+            }
+        else:
+            options = {
+                'quality': profile.get('quality', 85),
+                'optimize': profile.get('optimize', False) and not fast
+            }
+        
+        buffer = io.BytesIO()
+        img.save(buffer, format=fmt, **options)
+        return buffer.getvalue()
+    
+    def text_width(self, text: str, role: str) -> int:
+        """Rendered width of text in a font role (memoized)"""
+        if not self.fonts.get(role):
+            return len(text) * 6
+        size, bold = FONT_SIZES[role]
+        return _text_width(text, size, bold)
+    
+    def draw_text(self, img, draw, xy: Tuple[int, int], text: str, role: str, fill: str):
+        """Draw text in a font role, emoji as cached sprites"""
+        emoji_renderer.draw(img, draw, xy, text, self.fonts.get(role), fill)
+    
+    def draw_centered(self, img, draw, text: str, y: int, role: str, fill: str, width: int):
+        """Draw text horizontally centered across the image"""
+        x = (width - self.text_width(text, role)) // 2
+        self.draw_text(img, draw, (x, y), text, role, fill)
+    
+    def _base(self, name: str) -> Image.Image:
+        """Static background layer for a template, built once per process"""
+        base = self._bases.get(name)
+        if base is None:
+            base = getattr(self, f"_build_{name}_base")()
+            self._bases[name] = base
+        return base
+    
+    def _build_profile_base(self) -> Image.Image:
+        width, height = 600, 700
+        img = Image.new('RGB', (width, height), color='#0d1b2a')
+        draw = ImageDraw.Draw(img)
+        
+        # Header with gradient
+        for i in range(150):
+            alpha = i / 150
+            color = (
+                int(9 * (1 - alpha) + 13 * alpha),
+                int(132 * (1 - alpha) + 148 * alpha),
+                int(227 * (1 - alpha) + 199 * alpha)
+            )
+            draw.line([(0, i), (width, i)], fill=color)
+        
+        # Stat boxes and labels
+        for i, (label, color) in enumerate(PROFILE_STATS):
+            x = 30 + (i % 2) * 270
+            y = 210 + (i // 2) * 60
+            draw.rounded_rectangle([x, y, x + 240, y + 50], 
+                                 radius=10, fill=color)
+            self.draw_text(img, draw, (x + 10, y + 8), label, 'small', 'white')
+        
+        # Footer
+        footer = f"Family Tree Bot • v{Config.VERSION}"
+        self.draw_centered(img, draw, footer, height - 30, 'small', '#636e72', width)
+        return img
+    
+    def _build_family_tree_base(self) -> Image.Image:
+        width, height = 800, 600
+        img = Image.new('RGB', (width, height), color='#f8f9fa')
+        draw = ImageDraw.Draw(img)
+        
+        # Title
+        self.draw_centered(img, draw, "🌳 FAMILY TREE", 20, 'title', '#2d3436', width)
+        
+        # Main user circle in center
+        center_x, center_y = width//2, height//2
+        draw.ellipse([center_x - 60, center_y - 60, center_x + 60, center_y + 60], 
+                   fill='#0984e3', outline='#2d3436', width=3)
+        return img
+    
+    def _build_garden_base(self) -> Image.Image:
+        width, height = 600, 500
+        img = Image.new('RGB', (width, height), color='#1a1a2e')
+        draw = ImageDraw.Draw(img)
+        
+        # Background gradient
+        for i in range(height):
+            r = int(26 * (1 - i/height) + 10)
+            g = int(26 * (1 - i/height) + 20)
+            b = int(46 * (1 - i/height) + 30)
+            draw.line([(0, i), (width, i)], fill=(r, g, b))
+        
+        # Title with emoji
+        self.draw_centered(img, draw, "🌾 GARDEN", 20, 'title', '#4CAF50', width)
+        
+        # Cell backgrounds
+        for x1, y1 in self._garden_cells(width):
+            draw.rounded_rectangle([x1, y1, x1 + GARDEN_CELL, y1 + GARDEN_CELL], radius=15, 
+                                 fill='#2d3436', outline='#636e72', width=2)
+        return img
+    
+    def _garden_cells(self, width: int) -> List[Tuple[int, int]]:
+        """Top-left corner of each garden cell, row by row"""
+        start_x = (width - (GARDEN_GRID * GARDEN_CELL + (GARDEN_GRID - 1) * GARDEN_PADDING)) // 2
+        start_y = 80
+        return [
+            (start_x + col * (GARDEN_CELL + GARDEN_PADDING), start_y + row * (GARDEN_CELL + GARDEN_PADDING))
+            for row in range(GARDEN_GRID) for col in range(GARDEN_GRID)
+        ]
+    
+    def _build_scratch_base(self) -> Image.Image:
+        width, height = 400, 250
+        img = Image.new('RGB', (width, height), color='#2a9d8f')
+        draw = ImageDraw.Draw(img)
+        
+        # Decorative border
+        draw.rectangle([0, 0, width, height], outline='#264653', width=8)
+        
+        # Title with emoji
+        self.draw_centered(img, draw, "🎰 LOTTERY", 20, 'title', 'white', width)
+        
+        # Instructions with emoji
+        self.draw_centered(img, draw, "🔓 Use /scratch to reveal", height - 40, 'small', '#e9f5db', width)
+        return img
+    
+    def _build_scratch_mask_base(self) -> Image.Image:
+        # Opaque 4x4 square per cell, 1px gaps show the card background
+        cols = SCRATCH_SIZE[0] // SCRATCH_CELL
+        square_row = (b'\xff' * (SCRATCH_CELL - 1) + b'\x00') * cols
+        gap_row = b'\x00' * SCRATCH_SIZE[0]
+        rows = [square_row if y % SCRATCH_CELL < SCRATCH_CELL - 1 else gap_row
+                for y in range(SCRATCH_SIZE[1])]
+        return Image.frombytes('L', SCRATCH_SIZE, b''.join(rows))
+    
+    def scratch_texture(self) -> Image.Image:
+        """Random scratch texture: one palette index per cell, scaled up"""
+        cols, rows = SCRATCH_SIZE[0] // SCRATCH_CELL, SCRATCH_SIZE[1] // SCRATCH_CELL
+        cells = bytes(random.choices(range(3), k=cols * rows))
+        texture = Image.frombytes('P', (cols, rows), cells)
+        texture.putpalette(SCRATCH_PALETTE)
+        return texture.resize(SCRATCH_SIZE, Image.NEAREST)
+    
+    def create_profile_card(self, user_data: Dict, achievements: List[Dict], 
+                          family: List[Dict] = None, avatar: Optional[bytes] = None) -> Optional[bytes]:
+        """Create profile card from a prepared avatar (raw 100x100 RGBA)"""
         if not HAS_PILLOW:
             return None
         
         try:
             width, height = 600, 700  # Increased height for family
-            img = Image.new('RGB', (width, height), color='#0d1b2a')
+            img = self._base('profile').copy()
             draw = ImageDraw.Draw(img)
             
-            # Background
-            draw.rectangle([0, 0, width, height], fill='#0d1b2a')
-            
-            # Header with gradient
-            for i in range(150):
-                alpha = i / 150
-                color = (
-                    int(9 * (1 - alpha) + 13 * alpha),
-                    int(132 * (1 - alpha) + 148 * alpha),
-                    int(227 * (1 - alpha) + 199 * alpha)
-                )
-                draw.line([(0, i), (width, i)], fill=color)
-            
-            # Try to get profile picture
-            profile_pic = None
-            try:
-                import asyncio
-                # Run async function in sync context
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                profile_pic_data = loop.run_until_complete(
-                    self.download_profile_pic(bot, user_data['user_id'])
-                )
-                if profile_pic_data:
-                    profile_pic = Image.open(io.BytesIO(profile_pic_data))
-                    profile_pic = profile_pic.resize((100, 100))
-                    
-                    # Create circular mask
-                    mask = self.create_circular_mask(100)
-                    
-                    # Create circular profile picture
-                    circular_pic = Image.new('RGBA', (100, 100), (0, 0, 0, 0))
-                    circular_pic.paste(profile_pic, (0, 0), mask)
-                    
-                    # Paste on image
-                    img.paste(circular_pic, (width//2 - 50, 40), circular_pic)
-                    
-                    # Add border
-                    draw.ellipse([width//2 - 52, 38, width//2 + 52, 142], 
-                               outline='white', width=3)
-            except:
+            # Profile picture (already cropped and masked, no decode)
+            if avatar and len(avatar) == AVATAR_BYTES:
+                circular_pic = Image.frombytes('RGBA', (AVATAR_SIZE, AVATAR_SIZE), avatar)
+                
+                # Paste on image
+                img.paste(circular_pic, (width//2 - 50, 40), circular_pic)
+                
+                # Add border
+                draw.ellipse([width//2 - 52, 38, width//2 + 52, 142], 
+                           outline='white', width=3)
+            else:
                 # Fallback: Draw circle with initial
                 draw.ellipse([width//2 - 50, 40, width//2 + 50, 140], 
                            fill='#0984e3', outline='white', width=3)
                 initial = user_data.get('first_name', 'U')[0].upper()
-                draw.text((width//2 - 15, 75), initial, 
-                         fill='white', font=self.fonts['title'])
+                self.draw_centered(img, draw, initial, 75, 'title', 'white', width)
             
             # User name
             name = user_data.get('first_name', 'User')
-            draw.text((width//2 - 100, 160), f"👤 {name}", 
-                     fill='white', font=self.fonts['title'] if self.fonts['title'] else None)
-            
-            # Stats grid
-            stats = [
-                ("💰 Cash", f"${user_data.get('cash', 0):,}", "#00b894"),
-                ("🏦 Bank", f"${user_data.get('bank_balance', 0):,}", "#0984e3"),
-                ("⭐ Level", str(user_data.get('level', 1)), "#fd79a8"),
-                ("🔥 Streak", f"{user_data.get('daily_streak', 0)}d", "#fdcb6e")
+            self.draw_centered(img, draw, f"👤 {name}", 160, 'title', 'white', width)
+            
+            # Stat values (boxes and labels are in the base layer)
+            values = [
+                f"${user_data.get('cash', 0):,}",
+                f"${user_data.get('bank_balance', 0):,}",
+                str(user_data.get('level', 1)),
+                f"{user_data.get('daily_streak', 0)}d"
             ]
             
             y_offset = 210
-            for i, (label, value, color) in enumerate(stats):
+            for i, value in enumerate(values):
                 x = 30 + (i % 2) * 270
                 y = y_offset + (i // 2) * 60
                 
-                # Stat box
-                draw.rounded_rectangle([x, y, x + 240, y + 50], 
-                                     radius=10, fill=color)
-                
-                # Label
-                draw.text((x + 10, y + 8), label, 
-                         fill='white', font=self.fonts['small'] if self.fonts['small'] else None)
-                
-                # Value
-                draw.text((x + 10, y + 25), value, 
-                         fill='white', font=self.fonts['medium'] if self.fonts['medium'] else None)
+                self.draw_text(img, draw, (x + 10, y + 25), value, 'medium', 'white')
             
             # Family section (if provided)
             if family:
                 y_offset += 140
-                draw.text((30, y_offset), "👨‍👩‍👧‍👦 Family Members:", 
-                         fill='#FFC107', font=self.fonts['medium'] if self.fonts['medium'] else None)
+                self.draw_text(img, draw, (30, y_offset), "👨‍👩‍👧‍👦 Family Members:", 'medium', '#FFC107')
                 
                 # Show first 4 family members
                 for i, member in enumerate(family[:4]):
@@ -180,23 +524,13 @@ class ImageGenerator:
                                          radius=8, fill='#1b263b', outline='#6c5ce7', width=2)
                     
                     # Member name and relation
-                    relation_emoji = "💑" if member.get('relation') == 'spouse' else "👶"
+                    relation_emoji = RELATION_EMOJIS.get(member.get('relation'), "👶")
                     name = member.get('first_name', 'Unknown')[:12]
                     text = f"{relation_emoji} {name}"
-                    draw.text((x + 10, y + 10), text, 
-                             fill='white', font=self.fonts['small'] if self.fonts['small'] else None)
-            
-            # Footer
-            footer = f"Family Tree Bot • v{Config.VERSION}"
-            draw.text((width//2 - 100, height - 30), footer, 
-                     fill='#636e72', font=self.fonts['small'] if self.fonts['small'] else None)
+                    self.draw_text(img, draw, (x + 10, y + 10), text, 'small', 'white')
             
             # Save to bytes
-            buffer = io.BytesIO()
-            img.save(buffer, format='PNG', optimize=True, quality=85)
-            buffer.seek(0)
-            
-            return buffer.getvalue()
+            return self.encode(img, 'profile')
             
         except Exception as e:
             logger.error(f"Profile card error: {e}")
@@ -209,21 +543,13 @@ class ImageGenerator:
         
         try:
             width, height = 800, 600
-            img = Image.new('RGB', (width, height), color='#f8f9fa')
+            img = self._base('family_tree').copy()
             draw = ImageDraw.Draw(img)
             
-            # Title
-            draw.text((width//2 - 150, 20), "🌳 FAMILY TREE", 
-                     fill='#2d3436', font=self.fonts['title'] if self.fonts['title'] else None)
-            
             # Main user in center
             center_x, center_y = width//2, height//2
-            draw.ellipse([center_x - 60, center_y - 60, center_x + 60, center_y + 60], 
-                       fill='#0984e3', outline='#2d3436', width=3)
-            
             main_name = main_user.get('first_name', 'You')[:8]
-            draw.text((center_x - 40, center_y - 10), f"👑 {main_name}", 
-                     fill='white', font=self.fonts['medium'] if self.fonts['medium'] else None)
+            self.draw_text(img, draw, (center_x - 40, center_y - 10), f"👑 {main_name}", 'medium', 'white')
             
             # Draw family members around
             angles = [0, 45, 90, 135, 180, 225, 270, 315]
@@ -246,21 +572,15 @@ class ImageGenerator:
                 
                 # Member name
                 name = member.get('first_name', 'Unknown')[:6]
-                relation = "💑" if member.get('relation') == 'spouse' else "👶"
-                draw.text((x - 30, y - 10), f"{relation} {name}", 
-                         fill='white', font=self.fonts['small'] if self.fonts['small'] else None)
+                relation = RELATION_EMOJIS.get(member.get('relation'), "👶")
+                self.draw_text(img, draw, (x - 30, y - 10), f"{relation} {name}", 'small', 'white')
             
             # Stats
             stats_text = f"Total Family: {len(family)} members"
-            draw.text((width//2 - 100, height - 50), stats_text, 
-                     fill='#2d3436', font=self.fonts['medium'] if self.fonts['medium'] else None)
+            self.draw_centered(img, draw, stats_text, height - 50, 'medium', '#2d3436', width)
             
             # Save to bytes
-            buffer = io.BytesIO()
-            img.save(buffer, format='PNG', optimize=True)
-            buffer.seek(0)
-            
-            return buffer.getvalue()
+            return self.encode(img, 'family_tree')
             
         except Exception as e:
             logger.error(f"Family tree image error: {e}")
@@ -273,88 +593,55 @@ class ImageGenerator:
         
         try:
             width, height = 600, 500
-            img = Image.new('RGB', (width, height), color='#1a1a2e')
+            img = self._base('garden').copy()
             draw = ImageDraw.Draw(img)
             
-            # Background gradient
-            for i in range(height):
-                r = int(26 * (1 - i/height) + 10)
-                g = int(26 * (1 - i/height) + 20)
-                b = int(46 * (1 - i/height) + 30)
-                draw.line([(0, i), (width, i)], fill=(r, g, b))
-            
-            # Title with emoji
-            draw.text((width//2 - 50, 20), "🌾 GARDEN", 
-                     fill='#4CAF50', font=self.fonts['title'] if self.fonts['title'] else None)
-            
-            # Garden grid (3x3)
-            grid_size = 3
-            cell_size = 100
-            padding = 20
-            start_x = (width - (grid_size * cell_size + (grid_size - 1) * padding)) // 2
-            start_y = 80
-            
-            for row in range(grid_size):
-                for col in range(grid_size):
-                    idx = row * grid_size + col
-                    x1 = start_x + col * (cell_size + padding)
-                    y1 = start_y + row * (cell_size + padding)
-                    x2 = x1 + cell_size
-                    y2 = y1 + cell_size
+            # Garden grid (cell backgrounds are in the base layer)
+            for idx, (x1, y1) in enumerate(self._garden_cells(width)):
+                x2 = x1 + GARDEN_CELL
+                y2 = y1 + GARDEN_CELL
+                
+                if idx < len(plants):
+                    plant = plants[idx]
+                    progress = plant.get('current_progress', 0)
+                    
+                    # Crop emoji
+                    crop_emojis = {
+                        "carrot": "🥕", "tomato": "🍅", "potato": "🥔",
+                        "eggplant": "🍆", "corn": "🌽", "pepper": "🫑",
+                        "watermelon": "🍉", "pumpkin": "🎃"
+                    }
+                    emoji = crop_emojis.get(plant.get('crop_type', ''), '🌱')
+                    
+                    # Draw emoji
+                    self.draw_text(img, draw, (x1 + 35, y1 + 20), emoji, 'large', 'white')
                     
-                    # Cell background
-                    draw.rounded_rectangle([x1, y1, x2, y2], radius=15, 
-                                         fill='#2d3436', outline='#636e72', width=2)
+                    # Progress circle
+                    circle_x, circle_y = x1 + 50, y2 - 30
+                    radius = 20
                     
-                    if idx < len(plants):
-                        plant = plants[idx]
-                        progress = plant.get('current_progress', 0)
-                        
-                        # Crop emoji
-                        crop_emojis = {
-                            "carrot": "🥕", "tomato": "🍅", "potato": "🥔",
-                            "eggplant": "🍆", "corn": "🌽", "pepper": "🫑",
-                            "watermelon": "🍉", "pumpkin": "🎃"
-                        }
-                        emoji = crop_emojis.get(plant.get('crop_type', ''), '🌱')
-                        
-                        # Draw emoji
-                        draw.text((x1 + 35, y1 + 20), emoji, 
-                                 fill='white', font=self.fonts['large'] if self.fonts['large'] else None)
-                        
-                        # Progress circle
-                        circle_x, circle_y = x1 + 50, y2 - 30
-                        radius = 20
-                        
-                        # Background circle
-                        draw.ellipse([circle_x-radius, circle_y-radius, 
-                                    circle_x+radius, circle_y+radius], 
-                                   fill='#2d3436', outline='#636e72', width=2)
-                        
-                        # Progress text
-                        progress_text = f"{int(progress)}%"
-                        draw.text((circle_x - 10, circle_y - 8), progress_text, 
-                                 fill='white', font=self.fonts['small'] if self.fonts['small'] else None)
+                    # Background circle
+                    draw.ellipse([circle_x-radius, circle_y-radius, 
+                                circle_x+radius, circle_y+radius], 
+                               fill='#2d3436', outline='#636e72', width=2)
                     
-                    else:
-                        # Empty slot
-                        draw.text((x1 + 40, y1 + 40), "➕", 
-                                 fill='#666666', font=self.fonts['large'] if self.fonts['large'] else None)
+                    # Progress text
+                    progress_text = f"{int(progress)}%"
+                    self.draw_text(img, draw, (circle_x - 10, circle_y - 8), progress_text, 'small', 'white')
+                
+                else:
+                    # Empty slot
+                    self.draw_text(img, draw, (x1 + 40, y1 + 40), "➕", 'large', '#666666')
             
             # Stats at bottom
             ready_count = sum(1 for p in plants if p.get('current_progress', 0) >= 100)
             total_slots = garden_info.get('slots', 9)
             
             stats_text = f"📊 {len(plants)}/{total_slots} slots • ✅ {ready_count} ready"
-            draw.text((width//2 - 150, height - 40), stats_text, 
-                     fill='#CCCCCC', font=self.fonts['medium'] if self.fonts['medium'] else None)
+            self.draw_centered(img, draw, stats_text, height - 40, 'medium', '#CCCCCC', width)
             
             # Save to bytes
-            buffer = io.BytesIO()
-            img.save(buffer, format='PNG', optimize=True, compress_level=9)
-            buffer.seek(0)
-            
-            return buffer.getvalue()
+            return self.encode(img, 'garden')
             
         except Exception as e:
             logger.error(f"Garden image error: {e}")
@@ -367,46 +654,25 @@ class ImageGenerator:
         
         try:
             width, height = 400, 250
-            img = Image.new('RGB', (width, height), color='#2a9d8f')
+            img = self._base('scratch').copy()
             draw = ImageDraw.Draw(img)
             
-            # Decorative border
-            draw.rectangle([0, 0, width, height], outline='#264653', width=8)
-            
-            # Title with emoji
-            draw.text((width//2 - 80, 20), "🎰 LOTTERY", 
-                     fill='white', font=self.fonts['title'] if self.fonts['title'] else None)
-            
             # Ticket ID
-            draw.text((width//2 - 60, 60), f"#{ticket_id}", 
-                     fill='#ffd166', font=self.fonts['large'] if self.fonts['large'] else None)
+            self.draw_centered(img, draw, f"#{ticket_id}", 60, 'large', '#ffd166', width)
             
             # Scratch area
             scratch_x, scratch_y = width//2 - 150, 110
-            scratch_width, scratch_height = 300, 80
             
-            # Create scratch texture
-            for i in range(scratch_y, scratch_y + scratch_height, 5):
-                for j in range(scratch_x, scratch_x + scratch_width, 5):
-                    color = random.choice(['#e9c46a', '#f4a261', '#e76f51'])
-                    draw.rectangle([j, i, j+3, i+3], fill=color)
+            # Scratch texture, pasted in one step through the gap mask
+            img.paste(self.scratch_texture(), (scratch_x, scratch_y), self._base('scratch_mask'))
             
             # Hidden numbers hint
             if len(numbers) >= 6:
                 hint = f"🎫 {numbers[0]} • • • • {numbers[-1]}"
-                draw.text((scratch_x + 80, scratch_y + 30), hint, 
-                         fill='#264653', font=self.fonts['medium'] if self.fonts['medium'] else None)
-            
-            # Instructions with emoji
-            draw.text((width//2 - 120, height - 40), "🔓 Use /scratch to reveal", 
-                     fill='#e9f5db', font=self.fonts['small'] if self.fonts['small'] else None)
+                self.draw_text(img, draw, (scratch_x + 80, scratch_y + 30), hint, 'medium', '#264653')
             
             # Save to bytes
-            buffer = io.BytesIO()
-            img.save(buffer, format='PNG', optimize=True)
-            buffer.seek(0)
-            
-            return buffer.getvalue()
+            return self.encode(img, 'scratch')
             
         except Exception as e:
             logger.error(f"Scratch card error: {e}")
@@ -0,0 +1,115 @@
+"""
+📊 EVENT AGGREGATION
+Summarize the JSON-lines event stream written by utils/events.py
+
+Usage: python scripts/aggregate_events.py [--top N] [files or directories ...]
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+
+def event_files(paths):
+    """Expand directories to their events-*.jsonl files, oldest first"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "events-*.jsonl"))))
+        else:
+            files.append(path)
+    return files
+
+def read_events(files):
+    """Yield event dicts, skipping lines cut off by a crash"""
+    for path in files:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+def percentile(values, q):
+    """Nearest-rank percentile of a sorted list"""
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, int(round(q / 100 * len(values) + 0.5)) - 1))
+    return values[index]
+
+def aggregate(events):
+    """Weighted command and economy totals"""
+    commands = defaultdict(lambda: {"count": 0.0, "users": set(), "latencies": []})
+    economy = defaultdict(lambda: {"count": 0.0, "credited": 0.0, "debited": 0.0})
+    user_volume = defaultdict(float)
+    first_ts = last_ts = None
+
+    for event in events:
+        weight = event.get("w", 1)
+        ts = event.get("ts")
+        if ts is not None:
+            first_ts = ts if first_ts is None else min(first_ts, ts)
+            last_ts = ts if last_ts is None else max(last_ts, ts)
+
+        if event.get("ev") == "command":
+            stats = commands[event.get("cmd") or "?"]
+            stats["count"] += weight
+            if event.get("user") is not None:
+                stats["users"].add(event["user"])
+            if event.get("ms") is not None:
+                stats["latencies"].append(event["ms"])
+
+        elif event.get("ev") == "economy":
+            amount = event.get("amount", 0)
+            key = (event.get("cmd") or "-", event.get("type") or "?")
+            stats = economy[key]
+            stats["count"] += weight
+            if amount >= 0:
+                stats["credited"] += amount * weight
+            else:
+                stats["debited"] += -amount * weight
+            if event.get("user") is not None:
+                user_volume[event["user"]] += abs(amount) * weight
+
+    return commands, economy, user_volume, first_ts, last_ts
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize bot analytics events")
+    parser.add_argument("paths", nargs="*", default=[Config.EVENTS_DIR])
+    parser.add_argument("--top", type=int, default=10, help="users to list by economy volume")
+    args = parser.parse_args()
+
+    files = event_files(args.paths)
+    if not files:
+        print("No event files found")
+        return
+
+    commands, economy, user_volume, first_ts, last_ts = aggregate(read_events(files))
+    span = (last_ts - first_ts) / 3600 if first_ts is not None else 0
+    print(f"{len(files)} file(s), {span:.1f}h of events")
+
+    print(f"\n{'command':<16}{'count':>10}{'users':>8}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}")
+    for name, stats in sorted(commands.items(), key=lambda item: -item[1]["count"]):
+        latencies = sorted(stats["latencies"])
+        print(f"{name:<16}{stats['count']:>10.0f}{len(stats['users']):>8}"
+              f"{percentile(latencies, 50):>9.1f}{percentile(latencies, 95):>9.1f}"
+              f"{(latencies[-1] if latencies else 0):>9.1f}")
+
+    print(f"\n{'command':<16}{'balance':<14}{'count':>8}{'credited':>14}{'debited':>14}")
+    for (command, kind), stats in sorted(economy.items(), key=lambda item: -item[1]["count"]):
+        print(f"{command:<16}{kind:<14}{stats['count']:>8.0f}"
+              f"{stats['credited']:>14,.0f}{stats['debited']:>14,.0f}")
+
+    if user_volume and args.top:
+        print(f"\nTop {args.top} users by economy volume")
+        for user_id, volume in sorted(user_volume.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"  {user_id:<16}{volume:>14,.0f}")
+
+if __name__ == "__main__":
+    main()
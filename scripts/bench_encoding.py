@@ -0,0 +1,81 @@
+"""
+⏱️ ENCODING BENCHMARK
+Encode time vs output size for each card template and encoding profile
+
+Usage: python scripts/bench_encoding.py [rounds]
+"""
+
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from images import ImageGenerator, HAS_PILLOW
+
+PROFILES = [
+    ("png optimize l9 (old)", "PNG", {"optimize": True, "compress_level": 9}),
+    ("png l6", "PNG", {"compress_level": 6}),
+    ("png l3", "PNG", {"compress_level": 3}),
+    ("png l1 (fast)", "PNG", {"compress_level": 1}),
+    ("jpeg q90", "JPEG", {"quality": 90}),
+    ("jpeg q85 optimize", "JPEG", {"quality": 85, "optimize": True}),
+    ("webp q85 m4", "WEBP", {"quality": 85, "method": 4}),
+    ("webp q85 m0 (fast)", "WEBP", {"quality": 85, "method": 0}),
+]
+
+USER = {
+    "user_id": 1, "first_name": "Benchmark", "cash": 123456, "bank_balance": 654321,
+    "level": 12, "daily_streak": 7
+}
+FAMILY = [
+    {"first_name": "Alice", "relation": "spouse"},
+    {"first_name": "Bob", "relation": "child"},
+    {"first_name": "Carol", "relation": "child"},
+    {"first_name": "Dan", "relation": "parent"},
+]
+PLANTS = [
+    {"crop_type": crop, "current_progress": progress}
+    for crop, progress in [("carrot", 100), ("tomato", 65), ("corn", 20), ("pumpkin", 5), ("pepper", 90)]
+]
+
+def capture_images(gen: ImageGenerator) -> dict:
+    """Render every template once and keep the unencoded images"""
+    images = {}
+    gen.encode = lambda img, template: images.setdefault(template, img)
+    gen.create_profile_card(USER, [], FAMILY)
+    gen.create_family_tree_image(USER, FAMILY)
+    gen.create_garden_image(USER["first_name"], PLANTS, {"slots": 9})
+    gen.create_scratch_card("LOT-123456", "123456")
+    return images
+
+def bench(img, fmt: str, options: dict, rounds: int):
+    """Average encode time in ms and output size in bytes"""
+    if fmt == "JPEG":
+        img = img.convert("RGB")
+    size = 0
+    start = time.perf_counter()
+    for _ in range(rounds):
+        buffer = io.BytesIO()
+        img.save(buffer, format=fmt, **options)
+        size = buffer.tell()
+    return (time.perf_counter() - start) / rounds * 1000, size
+
+def main():
+    if not HAS_PILLOW:
+        print("Pillow is not installed")
+        return
+
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    images = capture_images(ImageGenerator())
+
+    for template, img in images.items():
+        print(f"\n{template} ({img.width}x{img.height})")
+        print(f"  {'profile':<24}{'ms':>8}{'KB':>9}")
+        for name, fmt, options in PROFILES:
+            ms, size = bench(img, fmt, options, rounds)
+            print(f"  {name:<24}{ms:>8.2f}{size / 1024:>9.1f}")
+
+if __name__ == "__main__":
+    main()
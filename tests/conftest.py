@@ -0,0 +1,44 @@
+"""
+🧪 TEST SETUP
+Point every on-disk path at a scratch directory before config is imported
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+
+import pytest
+
+_SCRATCH = tempfile.mkdtemp(prefix="familytreebot-tests-")
+os.environ.setdefault("LOGS_DIR", os.path.join(_SCRATCH, "logs"))
+os.environ.setdefault("EVENTS_ENABLED", "0")
+os.environ.setdefault("DB_PATH", os.path.join(_SCRATCH, "bot.db"))
+os.environ.setdefault("AVATAR_CACHE_DIR", os.path.join(_SCRATCH, "avatars"))
+os.environ.setdefault("RENDER_CACHE_DIR", os.path.join(_SCRATCH, "renders"))
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from database import Database
+
+@pytest.fixture
+def run():
+    """Run a coroutine to completion on a fresh event loop"""
+    return asyncio.run
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    """Fresh database file for one test"""
+    path = str(tmp_path / "bot.db")
+    monkeypatch.setattr(Config, "DB_PATH", path)
+    return path
+
+@pytest.fixture
+def open_db(db_path):
+    """Async factory for a connected Database on the test's file"""
+    async def _open():
+        db = Database()
+        assert await db.connect()
+        return db
+    return _open
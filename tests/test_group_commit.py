@@ -0,0 +1,40 @@
+"""
+🧪 GROUP COMMIT TESTS
+Concurrent writes share one commit, each behind its own savepoint
+"""
+
+import asyncio
+
+def test_group_commit_batches_concurrent_writes(run, open_db):
+    async def body():
+        db = await open_db()
+        try:
+            results = await asyncio.gather(*[
+                db.execute("INSERT INTO gifs (category, url) VALUES (?, ?)", ("hug", f"u{i}"))
+                for i in range(50)
+            ])
+            assert all(results)
+            row = await db.fetch_one("SELECT COUNT(*) AS n FROM gifs")
+            assert row["n"] == 50
+            # Fewer commits than writes: they were grouped
+            assert db.batch_stats["writes"] >= 50
+            assert db.batch_stats["batches"] < db.batch_stats["writes"]
+        finally:
+            await db.close()
+    run(body())
+
+def test_failed_write_only_rolls_back_its_savepoint(run, open_db):
+    async def body():
+        db = await open_db()
+        try:
+            good, bad, good2 = await asyncio.gather(
+                db.execute("INSERT INTO gifs (category, url) VALUES ('hug', 'a')"),
+                db.execute("INSERT INTO no_such_table VALUES (1)"),
+                db.execute("INSERT INTO gifs (category, url) VALUES ('hug', 'b')")
+            )
+            assert (good, bad, good2) == (True, False, True)
+            rows = await db.fetch_all("SELECT url FROM gifs ORDER BY url")
+            assert [row["url"] for row in rows] == ["a", "b"]
+        finally:
+            await db.close()
+    run(body())
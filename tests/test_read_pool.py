@@ -0,0 +1,69 @@
+"""
+🧪 READ POOL TESTS
+Query-only reader connections next to the single writer
+"""
+
+import asyncio
+
+from config import Config
+from database import Database
+
+def test_reads_use_query_only_pool(run, open_db):
+    async def body():
+        db = await open_db()
+        try:
+            assert len(db._readers) == Config.DB_READ_POOL_SIZE
+            reader = await db._acquire_reader()
+            try:
+                assert reader is not db.conn
+                cursor = await reader.execute("PRAGMA query_only")
+                assert (await cursor.fetchone())[0] == 1
+                await cursor.close()
+            finally:
+                db._release_reader(reader)
+            assert db._read_queue.qsize() == len(db._readers)
+        finally:
+            await db.close()
+    run(body())
+
+def test_concurrent_reads_see_committed_writes(run, open_db):
+    async def body():
+        db = await open_db()
+        try:
+            await db.create_user(1, "alice", "Alice")
+            rows = await asyncio.gather(*[
+                db.fetch_one("SELECT first_name FROM users WHERE user_id = 1") for _ in range(20)
+            ])
+            assert all(row == {"first_name": "Alice"} for row in rows)
+            stats = db.get_pool_stats()
+            assert stats["read"]["count"] >= 20
+            assert db._read_queue.qsize() == len(db._readers)
+        finally:
+            await db.close()
+    run(body())
+
+def test_failed_read_returns_reader(run, open_db):
+    async def body():
+        db = await open_db()
+        try:
+            assert await db.fetch_one("SELECT * FROM no_such_table") is None
+            assert await db.fetch_all("SELECT * FROM no_such_table") == []
+            assert db._read_queue.qsize() == len(db._readers)
+        finally:
+            await db.close()
+    run(body())
+
+def test_pool_disabled_falls_back_to_writer(run, db_path, monkeypatch):
+    monkeypatch.setattr(Config, "DB_READ_POOL_SIZE", 0)
+
+    async def body():
+        db = Database()
+        assert await db.connect()
+        try:
+            assert db._readers == []
+            assert await db._acquire_reader() is db.conn
+            await db.create_user(1, "alice", "Alice")
+            assert (await db.get_user(1))["first_name"] == "Alice"
+        finally:
+            await db.close()
+    run(body())
@@ -0,0 +1,48 @@
+"""
+🧪 TRANSACTION TESTS
+Multi-write handlers commit together or not at all
+"""
+
+async def _cash(db, user_id):
+    row = await db.fetch_one("SELECT cash FROM users WHERE user_id = ?", (user_id,))
+    return row["cash"]
+
+def test_transaction_rollback_restores_rows_and_cache(run, open_db):
+    async def body():
+        db = await open_db()
+        try:
+            await db.create_user(1, "alice", "Alice")
+            before = (await db.get_user(1))["cash"]
+
+            try:
+                async with db.transaction():
+                    assert await db.adjust_balance(1, {"cash": -100})
+                    await db.update_currency(1, "bank", 50)
+                    # Visible inside the block before commit
+                    assert (await db.get_user(1))["cash"] == before - 100
+                    raise ValueError("abort")
+            except ValueError:
+                pass
+
+            assert await _cash(db, 1) == before
+            user = await db.get_user(1)
+            assert user["cash"] == before
+            assert user["bank_balance"] == 0
+        finally:
+            await db.close()
+    run(body())
+
+def test_transaction_commits_and_nests(run, open_db):
+    async def body():
+        db = await open_db()
+        try:
+            await db.create_user(1, "alice", "Alice")
+            before = await _cash(db, 1)
+            async with db.transaction():
+                await db.adjust_balance(1, {"cash": -10})
+                async with db.transaction():
+                    await db.adjust_balance(1, {"cash": -5})
+            assert await _cash(db, 1) == before - 15
+        finally:
+            await db.close()
+    run(body())
@@ -0,0 +1,82 @@
+"""
+🧪 USER CACHE TESTS
+LRU/TTL cache in front of Database.get_user
+"""
+
+import asyncio
+import time
+
+from utils.cache import LRUCache
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["hits"] == 3
+
+def test_lru_counts_misses_and_expires(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    cache = LRUCache(maxsize=10, ttl=5)
+    cache.set("a", 1)
+
+    assert cache.get("missing") is None
+    assert cache.get("a") == 1
+    now[0] += 6
+    assert cache.get("a", "gone") == "gone"
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (1, 2, 0)
+
+def test_lru_disabled_when_size_zero():
+    cache = LRUCache(maxsize=0)
+    cache.set("a", 1)
+    assert len(cache) == 0
+
+def test_get_user_served_from_cache_and_updated_on_write(run, open_db):
+    async def body():
+        db = await open_db()
+        try:
+            await db.create_user(1, "alice", "Alice")
+            cash = (await db.get_user(1))["cash"]
+            await db.get_user(1)
+            assert db.get_cache_stats()["hits"] >= 1
+
+            await db.update_currency(1, "cash", 5)
+            assert (await db.get_user(1))["cash"] == cash + 5
+        finally:
+            await db.close()
+    run(body())
+
+def test_read_during_transaction_not_cached_past_commit(run, open_db):
+    async def body():
+        db = await open_db()
+        try:
+            await db.create_user(1, "alice", "Alice")
+            cash = (await db.get_user(1))["cash"]
+            written = asyncio.Event()
+            read = asyncio.Event()
+
+            async def reader():
+                await written.wait()
+                # Outside the block: sees (and may cache) the committed row
+                assert (await db.get_user(1))["cash"] == cash
+                read.set()
+
+            task = asyncio.create_task(reader())
+            async with db.transaction():
+                assert await db.adjust_balance(1, {"cash": -100})
+                written.set()
+                await read.wait()
+            await task
+
+            assert (await db.get_user(1))["cash"] == cash - 100
+        finally:
+            await db.close()
+    run(body())
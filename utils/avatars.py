@@ -0,0 +1,50 @@
+"""
+🖼️ AVATAR CACHE
+Disk cache of prepared profile pictures keyed by Telegram file_unique_id
+"""
+
+from typing import Any, Dict, Optional, Tuple
+
+from config import Config
+from utils.cache import DiskLRUCache, LRUCache
+
+AVATAR_SIZE = 100
+AVATAR_BYTES = AVATAR_SIZE * AVATAR_SIZE * 4  # raw RGBA
+
+class AvatarCache:
+    """Raw 100x100 RGBA avatars on disk with size-based LRU eviction"""
+
+    def __init__(self, cache_dir: str = None, max_bytes: int = None, ttl: float = None):
+        self.files = DiskLRUCache(
+            cache_dir or Config.AVATAR_CACHE_DIR,
+            max_bytes if max_bytes is not None else Config.AVATAR_CACHE_MAX_MB * 1024 * 1024,
+            suffix=".rgba"
+        )
+        # user_id -> (file_unique_id, file_id); "" means no profile photo
+        self.photo_ids = LRUCache(maxsize=10000, ttl=ttl if ttl is not None else Config.AVATAR_REVALIDATE_TTL)
+
+    def lookup_user(self, user_id: int) -> Optional[Tuple[str, str]]:
+        """Get the remembered (file_unique_id, file_id), None if unknown or stale"""
+        return self.photo_ids.get(user_id)
+
+    def remember_user(self, user_id: int, unique_id: str, file_id: str):
+        """Remember the user's current profile photo"""
+        self.photo_ids.set(user_id, (unique_id, file_id))
+
+    async def load(self, unique_id: str) -> Optional[bytes]:
+        """Get prepared avatar bytes from disk"""
+        data = await self.files.get(unique_id)
+        if data is not None and len(data) != AVATAR_BYTES:
+            await self.files.discard(unique_id)
+            return None
+        return data
+
+    async def store(self, unique_id: str, data: bytes):
+        """Save prepared avatar bytes"""
+        await self.files.set(unique_id, data)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get disk usage and hit/miss counters"""
+        return self.files.stats()
+
+avatar_cache = AvatarCache()
@@ -0,0 +1,202 @@
+"""
+🗃️ CACHE HELPERS
+Small in-memory caches shared across the bot
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+class LRUCache:
+    """Bounded LRU cache with optional TTL and hit/miss counters"""
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.peek(key, _MISSING) is not _MISSING
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """Get value without touching LRU order or counters"""
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+        return value
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get value and count a hit or miss"""
+        value = self.peek(key, _MISSING)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        """Store value, evicting the least recently used entry if full"""
+        if self.maxsize <= 0:
+            return
+
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove key and return its value"""
+        entry = self._data.pop(key, None)
+        return entry[0] if entry else default
+
+    def clear(self):
+        """Remove all entries"""
+        self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get size and hit/miss counters"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups * 100, 1) if lookups else 0.0
+        }
+
+class DiskLRUCache:
+    """Files in one directory with size-based LRU eviction"""
+
+    def __init__(self, cache_dir: str, max_bytes: int, suffix: str = ".bin"):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self.hits = 0
+        self.misses = 0
+        self._files = None  # key -> size, oldest first
+        self._total = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}{self.suffix}")
+
+    def _load_index(self):
+        """Scan the cache directory once, oldest files first"""
+        self._files = OrderedDict()
+        self._total = 0
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            entries = []
+            for entry in os.scandir(self.cache_dir):
+                if entry.name.endswith(self.suffix):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, entry.name[:-len(self.suffix)], stat.st_size))
+            for _, key, size in sorted(entries):
+                self._files[key] = size
+                self._total += size
+        except OSError as e:
+            logger.error(f"❌ Disk cache scan error ({self.cache_dir}): {e}")
+
+    def _read(self, key: str) -> bytes:
+        path = self._path(key)
+        with open(path, "rb") as f:
+            data = f.read()
+        os.utime(path)
+        return data
+
+    def _write(self, key: str, data: bytes, evict: list):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self._path(key) + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self._path(key))
+
+        for old_key in evict:
+            try:
+                os.remove(self._path(old_key))
+            except FileNotFoundError:
+                pass
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """Read a cached file, None on miss"""
+        if self._files is None:
+            await asyncio.to_thread(self._load_index)
+
+        if key not in self._files:
+            self.misses += 1
+            return None
+
+        try:
+            data = await asyncio.to_thread(self._read, key)
+        except OSError:
+            self._total -= self._files.pop(key, 0)
+            self.misses += 1
+            return None
+
+        self._files.move_to_end(key)
+        self.hits += 1
+        return data
+
+    async def set(self, key: str, data: bytes):
+        """Write a file, evicting the least recently used ones over the size cap"""
+        if self._files is None:
+            await asyncio.to_thread(self._load_index)
+
+        self._total -= self._files.pop(key, 0)
+        self._files[key] = len(data)
+        self._total += len(data)
+
+        evict = []
+        while self._total > self.max_bytes and len(self._files) > 1:
+            old_key, size = self._files.popitem(last=False)
+            self._total -= size
+            evict.append(old_key)
+
+        try:
+            await asyncio.to_thread(self._write, key, data, evict)
+        except OSError as e:
+            self._total -= self._files.pop(key, 0)
+            logger.error(f"❌ Disk cache write error ({self.cache_dir}): {e}")
+
+    async def discard(self, key: str):
+        """Forget a file, e.g. when its contents are invalid"""
+        if self._files and key in self._files:
+            self._total -= self._files.pop(key)
+            await asyncio.to_thread(self._remove, key)
+
+    def _remove(self, key: str):
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Get disk usage and hit/miss counters"""
+        lookups = self.hits + self.misses
+        return {
+            "files": len(self._files or ()),
+            "bytes": self._total,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups * 100, 1) if lookups else 0.0
+        }
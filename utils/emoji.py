@@ -0,0 +1,154 @@
+"""
+😀 EMOJI RENDERING
+Draw emoji in card text as cached color sprites
+"""
+
+import logging
+import os
+import re
+from typing import List, Optional, Tuple
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+    HAS_PILLOW = True
+except ImportError:
+    HAS_PILLOW = False
+
+from config import Config
+from utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# One emoji: flag pair, or a pictograph with optional variation selector,
+# skin tone and zero-width-joiner continuations (👨‍👩‍👧‍👦)
+_PICTO = "[\U0001F000-\U0001FAFF\u2190-\u21FF\u2300-\u23FF\u2600-\u27BF\u2B00-\u2BFF]"
+_MODS = "\uFE0F?[\U0001F3FB-\U0001F3FF]?"
+EMOJI_RE = re.compile(
+    f"[\U0001F1E6-\U0001F1FF]{{2}}|{_PICTO}{_MODS}(?:\u200D{_PICTO}{_MODS})*"
+)
+
+# Searched when no sprite file exists (fonts-noto-color-emoji in the Docker image)
+SYSTEM_EMOJI_FONTS = [
+    "/usr/share/fonts/truetype/noto/NotoColorEmoji.ttf",
+    "/usr/share/fonts/noto/NotoColorEmoji.ttf"
+]
+
+# Noto Color Emoji is a bitmap font that only loads at this size
+EMOJI_FONT_SIZE = 109
+
+_MISSING = object()
+
+def split_emoji(text: str) -> List[Tuple[str, bool]]:
+    """Split text into (run, is_emoji) pieces"""
+    parts = []
+    pos = 0
+    for match in EMOJI_RE.finditer(text):
+        if match.start() > pos:
+            parts.append((text[pos:match.start()], False))
+        parts.append((match.group(), True))
+        pos = match.end()
+    if pos < len(text):
+        parts.append((text[pos:], False))
+    return parts
+
+def sprite_names(emoji: str) -> List[str]:
+    """Candidate sprite file names (Twemoji and Noto naming)"""
+    codes = [f"{ord(c):x}" for c in emoji if c != "\uFE0F"]
+    return [
+        "-".join(codes) + ".png",
+        "emoji_u" + "_".join(code.zfill(4) for code in codes) + ".png"
+    ]
+
+class EmojiRenderer:
+    """Emoji sprites from the bundled directory or the color emoji font, cached per size"""
+
+    def __init__(self, emoji_dir: str = None):
+        self.emoji_dir = emoji_dir or Config.EMOJI_DIR
+        self.sprites = LRUCache(maxsize=2048)
+        self._font = None
+        self._font_loaded = False
+
+    def _load_font(self):
+        """Find the color emoji font once"""
+        self._font_loaded = True
+        for path in [Config.EMOJI_FONT] + SYSTEM_EMOJI_FONTS:
+            if path and os.path.exists(path):
+                try:
+                    self._font = ImageFont.truetype(path, EMOJI_FONT_SIZE)
+                    return
+                except OSError as e:
+                    logger.warning(f"Emoji font load error {path}: {e}")
+        logger.warning(
+            f"No emoji sprites or color emoji font found, emoji are left off cards "
+            f"(add sprites to {self.emoji_dir} or set EMOJI_FONT)"
+        )
+
+    def _from_sheet(self, emoji: str) -> Optional["Image.Image"]:
+        for name in sprite_names(emoji):
+            path = os.path.join(self.emoji_dir, name)
+            if os.path.exists(path):
+                return Image.open(path).convert("RGBA")
+        return None
+
+    def _from_font(self, emoji: str) -> Optional["Image.Image"]:
+        if not self._font_loaded:
+            self._load_font()
+        if not self._font:
+            return None
+
+        canvas = Image.new("RGBA", (EMOJI_FONT_SIZE * 2, EMOJI_FONT_SIZE * 2), (0, 0, 0, 0))
+        ImageDraw.Draw(canvas).text((0, 0), emoji, font=self._font, embedded_color=True)
+        bbox = canvas.getbbox()
+        return canvas.crop(bbox) if bbox else None
+
+    def sprite(self, emoji: str, size: int) -> Optional["Image.Image"]:
+        """Square RGBA sprite for an emoji, None if no source has it"""
+        key = (emoji, size)
+        cached = self.sprites.get(key, _MISSING)
+        if cached is not _MISSING:
+            return cached
+
+        sprite = None
+        try:
+            source = self._from_sheet(emoji) or self._from_font(emoji)
+            if source:
+                sprite = source.resize((size, size), Image.LANCZOS)
+        except Exception as e:
+            logger.warning(f"Emoji sprite error {emoji!r}: {e}")
+
+        # Misses are cached too, so unknown emoji cost nothing next time
+        self.sprites.set(key, sprite)
+        return sprite
+
+    def emoji_size(self, font) -> int:
+        """Sprite size matching a font's line height"""
+        return int(getattr(font, "size", 11))
+
+    def text_width(self, text: str, font) -> int:
+        """Width of text with emoji counted as sprites"""
+        size = self.emoji_size(font)
+        width = 0
+        for run, is_emoji in split_emoji(text):
+            if is_emoji:
+                width += size if self.sprite(run, size) else 0
+            elif font:
+                width += int(font.getlength(run))
+            else:
+                width += len(run) * 6
+        return width
+
+    def draw(self, img, draw, xy: Tuple[int, int], text: str, font, fill):
+        """Draw text runs with the font and paste each emoji as one sprite"""
+        x, y = xy
+        size = self.emoji_size(font)
+        for run, is_emoji in split_emoji(text):
+            if is_emoji:
+                sprite = self.sprite(run, size)
+                if sprite:
+                    img.paste(sprite, (int(x), int(y)), sprite)
+                    x += size
+            else:
+                draw.text((x, y), run, fill=fill, font=font)
+                x += font.getlength(run) if font else len(run) * 6
+
+emoji_renderer = EmojiRenderer()
@@ -0,0 +1,123 @@
+"""
+📈 EVENT STREAM
+Sampled, structured JSON-lines events for analytics
+"""
+
+import atexit
+import json
+import os
+import queue
+import random
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, Optional
+
+from config import Config
+
+# Command being handled, so deeper events (economy) can be attributed to it
+current_command: ContextVar[Optional[str]] = ContextVar("current_command", default=None)
+
+_STOP = object()
+
+class EventLog:
+    """
+    Buffered JSON-lines writer running on its own thread
+
+    emit() only samples and enqueues a tuple; JSON encoding and file
+    writes happen in batches on the writer thread. Files are one per day:
+    events-YYYYMMDD.jsonl with compact records such as
+    {"ts":1700000000.123,"ev":"command","user":1,"cmd":"slot","ms":12.5}.
+    Sampled records carry "w" (1/rate) so aggregates can be re-weighted.
+    """
+
+    def __init__(self, events_dir: str = None, sample_rates: Dict[str, float] = None,
+                 batch_size: int = None, flush_interval: float = None):
+        self.events_dir = events_dir or Config.EVENTS_DIR
+        self.sample_rates = sample_rates if sample_rates is not None else Config.EVENT_SAMPLE_RATES
+        self.batch_size = batch_size or Config.EVENT_BATCH_SIZE
+        self.flush_interval = flush_interval or Config.EVENT_FLUSH_INTERVAL
+        self.enabled = Config.EVENTS_ENABLED
+        self.written = 0
+        self.sampled_out = 0
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the writer thread"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="event-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Write what is queued and stop the writer thread"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread and thread.is_alive():
+            self._queue.put(_STOP)
+            thread.join(timeout=5)
+
+    def emit(self, event_type: str, **fields):
+        """Record an event, subject to the type's sampling rate"""
+        if not self.enabled:
+            return
+
+        rate = self.sample_rates.get(event_type, 1.0)
+        if rate < 1.0 and random.random() >= rate:
+            self.sampled_out += 1
+            return
+
+        if "cmd" not in fields:
+            fields["cmd"] = current_command.get()
+
+        if not self._thread:
+            self.start()
+        self._queue.put((time.time(), event_type, rate, fields))
+
+    def _encode(self, item) -> str:
+        ts, event_type, rate, fields = item
+        record = {"ts": round(ts, 3), "ev": event_type}
+        record.update((key, value) for key, value in fields.items() if value is not None)
+        if rate < 1.0:
+            record["w"] = round(1 / rate, 3) if rate > 0 else 0
+        return json.dumps(record, separators=(",", ":"), ensure_ascii=False, default=str)
+
+    def _write(self, batch: list):
+        os.makedirs(self.events_dir, exist_ok=True)
+        path = os.path.join(self.events_dir, f"events-{datetime.now():%Y%m%d}.jsonl")
+        lines = "".join(self._encode(item) + "\n" for item in batch)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(lines)
+        self.written += len(batch)
+
+    def _run(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+
+            stop = item is _STOP
+            if item is not None and not stop:
+                batch.append(item)
+
+            if batch and (stop or len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                try:
+                    self._write(batch)
+                except OSError as e:
+                    print(f"Event log write error: {e}")
+                batch = []
+
+            if stop:
+                return
+            if not batch:
+                deadline = time.monotonic() + self.flush_interval
+
+events = EventLog()
+atexit.register(events.stop)
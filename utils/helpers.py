@@ -8,9 +8,11 @@ from datetime import datetime, timedelta
 from typing import Optional, Tuple
 import random
 
-from aiogram.types import Message, User
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import BufferedInputFile, Message, User
 
 from config import Config
+from utils.render_cache import RenderedImage, render_cache
 
 def get_target_user(message: Message) -> Optional[User]:
     """Get target user from reply"""
@@ -126,3 +128,41 @@ def calculate_age(birth_date: datetime) -> int:
     if today.month < birth_date.month or (today.month == birth_date.month and today.day < birth_date.day):
         age -= 1
     return age
+
+# Bad Request descriptions meaning the cached file_id itself is unusable
+STALE_FILE_ID_ERRORS = (
+    "wrong file identifier",
+    "wrong remote file identifier",
+    "file reference expired",
+    "file_reference_expired",
+    "wrong file_id",
+    "invalid file_id"
+)
+
+def is_stale_file_id(error: Exception) -> bool:
+    """Check whether a TelegramBadRequest is about the file_id"""
+    text = str(getattr(error, "message", "") or error).lower()
+    return any(marker in text for marker in STALE_FILE_ID_ERRORS)
+
+async def answer_image(message: Message, image: RenderedImage, name: str,
+                       caption: str, parse_mode: str = "HTML") -> Message:
+    """Reply with a rendered image, reusing its Telegram file_id when possible"""
+    if image.key:
+        file_id = await render_cache.get_file_id(image.key)
+        if file_id:
+            try:
+                return await message.answer_photo(photo=file_id, caption=caption, parse_mode=parse_mode)
+            except TelegramBadRequest as e:
+                # Caption or parse errors would fail the upload too
+                if not is_stale_file_id(e):
+                    raise
+                await render_cache.forget_file_id(image.key)
+    
+    sent = await message.answer_photo(
+        photo=BufferedInputFile(image.data, filename=image.filename(name)),
+        caption=caption,
+        parse_mode=parse_mode
+    )
+    if image.key and sent.photo:
+        await render_cache.set_file_id(image.key, sent.photo[-1].file_id)
+    return sent
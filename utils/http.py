@@ -0,0 +1,77 @@
+"""
+🌐 HTTP CLIENT
+One pooled aiohttp session shared by all outbound downloads
+"""
+
+import asyncio
+import logging
+from typing import Optional
+
+import aiohttp
+
+from config import Config
+from utils.metrics import timed
+
+logger = logging.getLogger(__name__)
+
+# Worth retrying: rate limits and server-side failures
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class HttpClient:
+    """Keep-alive session with per-host limits, timeouts and retries"""
+
+    def __init__(self):
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    async def start(self):
+        """Open the shared session"""
+        if self.session and not self.session.closed:
+            return
+
+        connector = aiohttp.TCPConnector(
+            limit=Config.HTTP_POOL_SIZE,
+            limit_per_host=Config.HTTP_PER_HOST_LIMIT,
+            keepalive_timeout=Config.HTTP_KEEPALIVE,
+            ttl_dns_cache=300
+        )
+        timeout = aiohttp.ClientTimeout(
+            total=Config.HTTP_TIMEOUT,
+            sock_connect=Config.HTTP_CONNECT_TIMEOUT
+        )
+        self.session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        logger.info("✅ HTTP client started")
+
+    async def close(self):
+        """Close the shared session"""
+        if self.session and not self.session.closed:
+            await self.session.close()
+            logger.info("✅ HTTP client closed")
+        self.session = None
+
+    @timed("http")
+    async def get_bytes(self, url: str, retries: int = None) -> Optional[bytes]:
+        """GET a URL and return the body, retrying transient failures"""
+        if not self.session or self.session.closed:
+            await self.start()
+
+        retries = Config.HTTP_RETRIES if retries is None else retries
+        for attempt in range(retries + 1):
+            try:
+                async with self.session.get(url) as response:
+                    if response.status == 200:
+                        return await response.read()
+                    if response.status not in RETRY_STATUSES:
+                        logger.warning(f"HTTP {response.status} from {response.url.host}")
+                        return None
+                    error = f"HTTP {response.status}"
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                # Don't log the URL, file URLs carry the bot token
+                error = type(e).__name__
+
+            if attempt < retries:
+                await asyncio.sleep(Config.HTTP_RETRY_BACKOFF * 2 ** attempt)
+
+        logger.error(f"❌ HTTP download failed after {retries + 1} attempts: {error}")
+        return None
+
+http_client = HttpClient()
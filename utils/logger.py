@@ -3,36 +3,181 @@
 Enhanced logging with Telegram channel integration
 """
 
+import asyncio
+import atexit
+import html
 import logging
 import logging.handlers
+import multiprocessing
+import queue
+import re
 import sys
 import os
+from collections import deque
 from datetime import datetime
 from typing import Optional
 
 from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
 
 from config import Config
+from utils.events import events
 
 # Global logger instance
 _logger = None
 
+# Background thread that formats and writes file/console records
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.handlers.QueueHandler] = None
+_direct_handlers = []
+
+# Telegram message length limit; one queued message is capped lower so it
+# always fits next to the dropped-messages notice and a separator
+TELEGRAM_MESSAGE_LIMIT = 4096
+MAX_CHANNEL_MESSAGE = 4000
+BATCH_SEPARATOR = "\n➖➖➖➖➖\n"
+
+_TAG_RE = re.compile(r"<[^>]*>")
+
+def truncate_html(text: str, limit: int = MAX_CHANNEL_MESSAGE) -> str:
+    """
+    Cut an HTML message to limit characters without breaking markup
+    
+    Messages that fit are returned unchanged. Longer ones are flattened
+    to escaped plain text first, so the cut can't land inside a tag or
+    entity and make Telegram reject the whole merged batch.
+    """
+    if len(text) <= limit:
+        return text
+    
+    plain = html.unescape(_TAG_RE.sub("", text))
+    out = []
+    size = 0
+    for char in plain:
+        escaped = html.escape(char, quote=False)
+        if size + len(escaped) > limit - 1:
+            break
+        out.append(escaped)
+        size += len(escaped)
+    return "".join(out) + "…"
+
+class TelegramLogShipper:
+    """Background sender that merges queued channel logs into few messages"""
+    
+    def __init__(self, max_queue: int = None, interval: float = None):
+        self.bot: Optional[Bot] = None
+        self.interval = interval or Config.LOG_FLUSH_INTERVAL
+        self.queue = deque(maxlen=max_queue or Config.LOG_QUEUE_SIZE)
+        self.dropped = 0
+        self.sent = 0
+        self._pending = None  # merged batch waiting out a flood limit
+        self._task = None
+    
+    def start(self, bot: Bot):
+        """Start shipping in the background on the running loop"""
+        self.bot = bot
+        if not self._task or self._task.done():
+            self._task = asyncio.create_task(self._run())
+    
+    def submit(self, text: str):
+        """Queue a message without waiting; the oldest is dropped when full"""
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1
+        self.queue.append(truncate_html(text))
+    
+    def _next_batch(self) -> Optional[str]:
+        """Merge queued messages up to the Telegram length limit"""
+        if self._pending:
+            return self._pending
+        
+        parts = []
+        if self.dropped:
+            parts.append(f"⚠️ <b>{self.dropped} log messages dropped</b>")
+            self.dropped = 0
+        
+        # The first queued message is always taken (submit capped its size),
+        # so an oversized message can never stall the queue behind it
+        size = sum(len(part) for part in parts) + len(BATCH_SEPARATOR) * len(parts)
+        taken = 0
+        while self.queue and (not taken or size + len(self.queue[0]) <= TELEGRAM_MESSAGE_LIMIT):
+            part = self.queue.popleft()
+            parts.append(part)
+            size += len(part) + len(BATCH_SEPARATOR)
+            taken += 1
+        
+        self._pending = BATCH_SEPARATOR.join(parts) if parts else None
+        return self._pending
+    
+    async def flush(self):
+        """Send everything queued, waiting out flood limits"""
+        while self.bot and self._next_batch():
+            try:
+                await self.bot.send_message(
+                    chat_id=Config.LOG_CHANNEL,
+                    text=self._pending,
+                    parse_mode="HTML",
+                    disable_web_page_preview=True
+                )
+                self.sent += 1
+            except TelegramRetryAfter as e:
+                # Keep the batch, new messages keep queueing meanwhile
+                await asyncio.sleep(e.retry_after)
+                continue
+            except TelegramBadRequest as e:
+                # Malformed HTML in one part fails the whole batch: send it as plain text
+                print(f"Log channel rejected HTML ({e}), resending as plain text")
+                await self._send_plain(self._pending)
+            except Exception as e:
+                # Avoid recursion: don't log through the logger here
+                print(f"Failed to send to log channel: {e}")
+            self._pending = None
+    
+    async def _send_plain(self, text: str):
+        try:
+            await self.bot.send_message(
+                chat_id=Config.LOG_CHANNEL,
+                text=text,
+                parse_mode=None,
+                disable_web_page_preview=True
+            )
+            self.sent += 1
+        except Exception as e:
+            print(f"Failed to send to log channel: {e}")
+    
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+    
+    async def stop(self, timeout: float = 5.0):
+        """Stop the background task and send what is left"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        
+        try:
+            await asyncio.wait_for(self.flush(), timeout)
+        except asyncio.TimeoutError:
+            print(f"Log channel flush timed out, {len(self.queue)} messages lost")
+
+log_shipper = TelegramLogShipper()
+
 class TelegramLogHandler(logging.Handler):
     """Custom handler to send logs to Telegram channel"""
     
-    def __init__(self, bot: Optional[Bot] = None):
+    def __init__(self, shipper: TelegramLogShipper = None):
         super().__init__()
-        self.bot = bot
+        self.shipper = shipper or log_shipper
         self.setLevel(logging.ERROR)  # Only send errors by default
     
-    def set_bot(self, bot: Bot):
-        """Set bot instance for sending messages"""
-        self.bot = bot
-    
     def emit(self, record):
-        """Send log record to Telegram"""
+        """Queue log record for the Telegram channel"""
         try:
-            if self.bot and hasattr(record, 'message'):
+            if self.shipper.bot:
                 # Format message for Telegram
                 level = record.levelname
                 message = record.getMessage()
@@ -41,6 +186,9 @@ class TelegramLogHandler(logging.Handler):
                 if len(message) > 1000:
                     message = message[:1000] + "..."
                 
+                # Exception text often contains <...>, which breaks HTML parsing
+                message = html.escape(message, quote=False)
+                
                 log_msg = f"""
 ⚠️ <b>BOT ERROR</b>
 
@@ -51,18 +199,8 @@ class TelegramLogHandler(logging.Handler):
 📍 <b>Location:</b> {record.filename}:{record.lineno}
 """
                 
-                # Try to send to log channel
-                import asyncio
-                try:
-                    asyncio.create_task(
-                        self.bot.send_message(
-                            chat_id=Config.LOG_CHANNEL,
-                            text=log_msg,
-                            parse_mode="HTML"
-                        )
-                    )
-                except:
-                    pass
+                # Shipped in the background, merged with other logs
+                self.shipper.submit(log_msg)
                     
         except Exception as e:
             # Avoid recursion if logging fails
@@ -70,7 +208,7 @@ class TelegramLogHandler(logging.Handler):
 
 def setup_logger() -> logging.Logger:
     """Setup comprehensive logging system"""
-    global _logger
+    global _logger, _listener, _queue_handler, _direct_handlers
     
     if _logger:
         return _logger
@@ -107,20 +245,36 @@ def setup_logger() -> logging.Logger:
     file_handler.setFormatter(formatter)
     console_handler.setFormatter(formatter)
     
-    # Add handlers
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
-    logger.addHandler(telegram_handler)
+    # File and console I/O (formatting, rotation, writes) run on a listener
+    # thread; the calling thread only enqueues the record. The queue sits on
+    # the root logger so module loggers (database, images, handlers, aiogram)
+    # never write on the event loop either.
+    log_queue = queue.SimpleQueue()
+    _direct_handlers = [file_handler, console_handler]
+    _listener = logging.handlers.QueueListener(
+        log_queue, *_direct_handlers, respect_handler_level=True
+    )
+    _listener.start()
+    atexit.register(stop_logging)
+    
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    _queue_handler = logging.handlers.QueueHandler(log_queue)
+    root.addHandler(_queue_handler)
     
-    # Prevent propagation to root logger
-    logger.propagate = False
+    # aiogram logs every handled update at INFO, too chatty for the file
+    logging.getLogger("aiogram.event").setLevel(logging.WARNING)
+    
+    # Channel alerts stay limited to the bot's own logger; its records
+    # propagate to the root queue for the file and console
+    logger.addHandler(telegram_handler)
     
     _logger = logger
     return logger
 
 async def log_to_channel(bot: Bot, message: str, level: str = "INFO"):
     """
-    Send message to log channel
+    Queue message for the log channel (sent in the background)
     
     Args:
         bot: Bot instance
@@ -150,13 +304,10 @@ async def log_to_channel(bot: Bot, message: str, level: str = "INFO"):
 🕒 {timestamp}
 """
         
-        # Send to log channel
-        await bot.send_message(
-            chat_id=Config.LOG_CHANNEL,
-            text=formatted_msg,
-            parse_mode="HTML",
-            disable_web_page_preview=True
-        )
+        # Queue for the log channel, never waits on the Bot API
+        if not log_shipper.bot:
+            log_shipper.start(bot)
+        log_shipper.submit(formatted_msg)
         
         # Also log locally
         logger = logging.getLogger("FamilyTreeBot")
@@ -168,30 +319,44 @@ async def log_to_channel(bot: Bot, message: str, level: str = "INFO"):
             logger.error(f"Log channel: {message[:100]}...")
         
     except Exception as e:
-        # Fallback to console if Telegram fails
-        print(f"Failed to send to log channel: {e}")
+        # Fallback to console if queueing fails
+        print(f"Failed to queue log channel message: {e}")
         print(f"Original message: {message}")
 
-def log_command_usage(user_id: int, username: str, command: str):
-    """Log command usage for analytics"""
-    logger = logging.getLogger("FamilyTreeBot")
-    logger.info(f"Command used - User: {user_id} (@{username}), Command: {command}")
-
-def log_economy_transaction(user_id: int, transaction_type: str, amount: int, details: str = ""):
-    """Log economy transactions"""
-    logger = logging.getLogger("FamilyTreeBot")
-    logger.info(f"Economy - User: {user_id}, Type: {transaction_type}, Amount: {amount}, Details: {details}")
+def log_command_usage(user_id: int, username: str, command: str, latency_ms: float = None):
+    """Record command usage as a structured analytics event"""
+    events.emit("command", user=user_id, cmd=command,
+                ms=round(latency_ms, 2) if latency_ms is not None else None)
 
 def log_error(error: Exception, context: str = ""):
     """Log error with context"""
     logger = logging.getLogger("FamilyTreeBot")
     logger.error(f"Error in {context}: {str(error)}", exc_info=True)
 
+def stop_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener, _queue_handler
+    
+    if _listener:
+        _listener.stop()
+        _listener = None
+    
+    # Records logged after shutdown are written directly instead of
+    # piling up in a queue nobody drains
+    if _queue_handler:
+        root = logging.getLogger()
+        root.removeHandler(_queue_handler)
+        _queue_handler = None
+        for handler in _direct_handlers:
+            root.addHandler(handler)
+
 def get_logger() -> logging.Logger:
     """Get logger instance"""
     if _logger is None:
         return setup_logger()
     return _logger
 
-# Initialize logger on import
-setup_logger()
+# Initialize logger on import, only in the main process: spawned render
+# workers re-import bot.py and must not open and rotate logs/bot.log too
+if multiprocessing.parent_process() is None:
+    setup_logger()
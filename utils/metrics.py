@@ -0,0 +1,169 @@
+"""
+⏱️ PERFORMANCE METRICS
+Bucketed latency histograms per command, split by where the time went
+"""
+
+import functools
+import logging
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+# Where handler time is spent: database, rendering, Bot API, other HTTP
+PARTS = ("db", "image", "api", "http")
+
+# Key shared by every "/..." message no handler matched
+OTHER_COMMAND = "other"
+
+# Bucket upper bounds in milliseconds (last bucket is +Inf)
+LATENCY_BUCKETS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+# Per-update accumulator, shared with tasks the handler spawns
+_request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_timings", default=None)
+
+class Histogram:
+    """Fixed-bucket histogram with interpolated quantiles"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        """Add one observation"""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Estimate the q-quantile (0..1) by interpolating inside its bucket"""
+        if not self.count:
+            return 0.0
+
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                if i == len(self.buckets):
+                    return self.max
+                lower = self.buckets[i - 1] if i else 0.0
+                upper = min(self.buckets[i], self.max)
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.max
+
+    def merge(self, other: "Histogram"):
+        """Add another histogram with the same buckets into this one"""
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+class CommandStats:
+    """
+    Latency histograms and error count for one command
+
+    Errors count both exceptions that escape the handler and ERROR log
+    records written while it runs, since most handlers catch their own
+    failures, log them and reply with an error message.
+    """
+
+    def __init__(self):
+        self.total = Histogram()
+        self.parts = {part: Histogram() for part in PARTS}
+        self.errors = 0
+
+    def merge(self, other: "CommandStats"):
+        """Fold another command's stats into this one"""
+        self.total.merge(other.total)
+        for part in PARTS:
+            self.parts[part].merge(other.parts[part])
+        self.errors += other.errors
+
+class Metrics:
+    """Process-wide counters and histograms"""
+
+    def __init__(self):
+        self.started = time.time()
+        self.commands: Dict[str, CommandStats] = defaultdict(CommandStats)
+        self.parts = {part: Histogram() for part in PARTS}
+        self.api_calls = defaultdict(int)
+        self.api_errors = defaultdict(int)
+        self.updates = defaultdict(int)
+        self.update_errors = defaultdict(int)
+        self.update_latency = Histogram()
+        self.in_flight = 0
+
+    def observe_command(self, command: str, total_ms: float, timings: Dict[str, float], error: bool):
+        """Record one handled command"""
+        stats = self.commands[command]
+        stats.total.observe(total_ms)
+        for part in PARTS:
+            stats.parts[part].observe(timings.get(part, 0.0) * 1000)
+        if error or timings.get("errors"):
+            stats.errors += 1
+
+    def uptime(self) -> float:
+        return time.time() - self.started
+
+metrics = Metrics()
+
+def start_request():
+    """Begin accumulating part timings (and logged errors) for the current update"""
+    timings = {part: 0.0 for part in PARTS}
+    timings["errors"] = 0
+    return _request_timings.set(timings)
+
+def finish_request(token) -> Dict[str, float]:
+    """Stop accumulating and return the part timings in seconds"""
+    timings = _request_timings.get() or {}
+    _request_timings.reset(token)
+    return timings
+
+def record_time(part: str, seconds: float):
+    """Add time spent in a part to the global and per-update totals"""
+    metrics.parts[part].observe(seconds * 1000)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[part] += seconds
+
+@contextmanager
+def track(part: str):
+    """Time a block (may contain awaits) as part of the current update"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_time(part, time.perf_counter() - start)
+
+def timed(part: str):
+    """Decorator form of track() for coroutine functions"""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with track(part):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+class RequestErrorHandler(logging.Handler):
+    """Count ERROR records against the update being handled"""
+
+    def __init__(self):
+        super().__init__(level=logging.ERROR)
+
+    def emit(self, record: logging.LogRecord):
+        timings = _request_timings.get()
+        if timings is not None:
+            timings["errors"] += 1
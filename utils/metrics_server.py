@@ -0,0 +1,204 @@
+"""
+📡 METRICS ENDPOINT
+Prometheus text exposition of bot counters and histograms
+"""
+
+import logging
+from typing import Dict, Iterable, List, Optional
+
+from aiohttp import web
+
+from config import Config
+from utils.avatars import avatar_cache
+from utils.metrics import OTHER_COMMAND, PARTS, CommandStats, Histogram, metrics
+from utils.render_cache import render_cache
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(**labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+class Exposition:
+    """Builds the text format, one HELP/TYPE header per metric family"""
+
+    def __init__(self):
+        self.lines: List[str] = []
+
+    def family(self, name: str, kind: str, help_text: str):
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+
+    def sample(self, name: str, value, **labels):
+        value = value if isinstance(value, int) else repr(float(value))
+        self.lines.append(f"{name}{_labels(**labels)} {value}")
+
+    def histogram(self, name: str, hist: Histogram, **labels):
+        """Millisecond histogram exported in seconds, as Prometheus expects"""
+        cumulative = 0
+        for bound, count in zip(hist.buckets, hist.counts):
+            cumulative += count
+            self.sample(f"{name}_bucket", cumulative, **labels, le=f"{bound / 1000:g}")
+        self.sample(f"{name}_bucket", hist.count, **labels, le="+Inf")
+        self.sample(f"{name}_sum", hist.sum / 1000, **labels)
+        self.sample(f"{name}_count", hist.count, **labels)
+
+    def text(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+class MetricsServer:
+    """Small aiohttp app serving /metrics for a local scraper"""
+
+    def __init__(self):
+        self.db = None
+        self.image_gen = None
+        self.commands = set()
+        self._runner: Optional[web.AppRunner] = None
+
+    async def start(self, db=None, image_gen=None, commands: Iterable[str] = (),
+                    host: str = None, port: int = None):
+        """Start listening (no-op if already running)"""
+        self.db = db
+        self.image_gen = image_gen
+        self.commands = set(commands)
+        if self._runner:
+            return
+
+        host = host or Config.METRICS_HOST
+        port = port or Config.METRICS_PORT
+        app = web.Application()
+        app.router.add_get("/metrics", self.handle_metrics)
+        runner = web.AppRunner(app, access_log=None)
+        try:
+            await runner.setup()
+            await web.TCPSite(runner, host, port).start()
+        except OSError as e:
+            logger.error(f"❌ Metrics endpoint failed on {host}:{port}: {e}")
+            await runner.cleanup()
+            return
+
+        self._runner = runner
+        logger.info(f"📡 Metrics endpoint on http://{host}:{port}/metrics")
+
+    async def stop(self):
+        """Stop listening"""
+        runner, self._runner = self._runner, None
+        if runner:
+            await runner.cleanup()
+
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        try:
+            body = self.render()
+        except Exception as e:
+            logger.error(f"Metrics render error: {e}")
+            return web.Response(status=500, text="metrics unavailable\n")
+        return web.Response(body=body.encode(), headers={"Content-Type": CONTENT_TYPE})
+
+    def _cache_stats(self) -> dict:
+        caches = {}
+        renders = render_cache.stats()
+        caches["render_memory"] = renders["memory"]
+        caches["render_disk"] = renders["disk"]
+        caches["file_id"] = renders["file_ids"]
+        caches["avatar"] = avatar_cache.stats()
+        if self.db:
+            caches["user"] = self.db.get_cache_stats()
+        return caches
+
+    def _command_stats(self) -> Dict[str, CommandStats]:
+        """Per-command stats with labels limited to registered commands"""
+        labelled = {}
+        other = CommandStats()
+        for command, stats in metrics.commands.items():
+            if command in self.commands:
+                labelled[command] = stats
+            else:
+                other.merge(stats)
+        if other.total.count:
+            labelled[OTHER_COMMAND] = other
+        return dict(sorted(labelled.items()))
+
+    def render(self) -> str:
+        """Current metrics in Prometheus text format"""
+        out = Exposition()
+
+        out.family("bot_uptime_seconds", "gauge", "Seconds since the process started")
+        out.sample("bot_uptime_seconds", metrics.uptime())
+
+        out.family("bot_updates_total", "counter", "Updates processed by type")
+        for update_type, count in sorted(metrics.updates.items()):
+            out.sample("bot_updates_total", count, type=update_type)
+
+        out.family("bot_update_errors_total", "counter", "Updates whose handler raised")
+        for update_type, count in sorted(metrics.update_errors.items()):
+            out.sample("bot_update_errors_total", count, type=update_type)
+
+        out.family("bot_updates_in_flight", "gauge", "Updates currently being handled")
+        out.sample("bot_updates_in_flight", metrics.in_flight)
+
+        out.family("bot_update_duration_seconds", "histogram", "Time to handle one update")
+        out.histogram("bot_update_duration_seconds", metrics.update_latency)
+
+        commands = self._command_stats()
+        out.family("bot_command_duration_seconds", "histogram", "Command handler latency")
+        for command, stats in commands.items():
+            out.histogram("bot_command_duration_seconds", stats.total, command=command)
+
+        out.family("bot_command_errors_total", "counter", "Commands that raised or logged an error")
+        for command, stats in commands.items():
+            out.sample("bot_command_errors_total", stats.errors, command=command)
+
+        out.family("bot_command_part_seconds_total", "counter",
+                   "Handler time spent in db, image, api and http, per command")
+        for command, stats in commands.items():
+            for part in PARTS:
+                out.sample("bot_command_part_seconds_total", stats.parts[part].sum / 1000,
+                           command=command, part=part)
+
+        out.family("bot_operation_duration_seconds", "histogram",
+                   "Single DB query, image render, Bot API call or HTTP download")
+        for part in PARTS:
+            out.histogram("bot_operation_duration_seconds", metrics.parts[part], part=part)
+
+        out.family("bot_api_requests_total", "counter", "Outgoing Bot API calls by method")
+        for method, count in sorted(metrics.api_calls.items()):
+            out.sample("bot_api_requests_total", count, method=method)
+
+        out.family("bot_api_errors_total", "counter", "Failed Bot API calls by method")
+        for method, count in sorted(metrics.api_errors.items()):
+            out.sample("bot_api_errors_total", count, method=method)
+
+        caches = self._cache_stats()
+        out.family("bot_cache_hits_total", "counter", "Cache hits")
+        for name, stats in caches.items():
+            out.sample("bot_cache_hits_total", stats["hits"], cache=name)
+        out.family("bot_cache_misses_total", "counter", "Cache misses")
+        for name, stats in caches.items():
+            out.sample("bot_cache_misses_total", stats["misses"], cache=name)
+
+        if self.image_gen:
+            out.family("bot_render_queue_depth", "gauge", "Renders queued or running in the pool")
+            out.sample("bot_render_queue_depth", self.image_gen.pending)
+            out.family("bot_render_queue_limit", "gauge", "Render queue depth before renders are skipped")
+            out.sample("bot_render_queue_limit", Config.IMAGE_QUEUE_DEPTH)
+
+        if self.db:
+            lanes = self.db.pool_stats
+            out.family("bot_db_waits_total", "counter", "Connection acquisitions per lane")
+            for lane, stats in lanes.items():
+                out.sample("bot_db_waits_total", stats["count"], lane=lane)
+            out.family("bot_db_wait_seconds_total", "counter", "Time spent waiting for a connection")
+            for lane, stats in lanes.items():
+                out.sample("bot_db_wait_seconds_total", stats["wait_total"], lane=lane)
+            out.family("bot_db_commits_total", "counter", "Group commits on the write lane")
+            out.sample("bot_db_commits_total", self.db.batch_stats["batches"])
+
+        return out.text()
+
+metrics_server = MetricsServer()
@@ -0,0 +1,118 @@
+"""
+🧭 DISPATCHER MIDDLEWARE
+Per-command timing, latency metrics and analytics events
+"""
+
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from aiogram import BaseMiddleware
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.dispatcher.event.bases import UNHANDLED
+from aiogram.filters import Command
+from aiogram.types import Message, Update
+
+from utils.events import current_command
+from utils.logger import log_command_usage
+from utils.metrics import OTHER_COMMAND, finish_request, metrics, record_time, start_request
+
+def parse_command(message: Message) -> Tuple[Optional[str], Optional[str]]:
+    """'/slot@MyBot 100' -> ('slot', 'mybot')"""
+    text = message.text or message.caption or ""
+    if not text.startswith("/"):
+        return None, None
+    name, _, mention = text.split(maxsplit=1)[0][1:].partition("@")
+    return name.lower() or None, mention.lower() or None
+
+def registered_commands(router) -> Set[str]:
+    """Command names handled by a router and all its sub-routers"""
+    names = set()
+    for sub_router in router.chain_tail:
+        for handler in sub_router.message.handlers:
+            for handler_filter in handler.filters or ():
+                if isinstance(handler_filter.callback, Command):
+                    for command in handler_filter.callback.commands:
+                        name = getattr(command, "command", command)
+                        if isinstance(name, str):
+                            names.add(name.lower())
+    return names
+
+async def addressed_elsewhere(bot, mention: Optional[str]) -> bool:
+    """Check whether '/cmd@OtherBot' names a different bot"""
+    if not mention or bot is None:
+        return False
+    me = await bot.me()
+    return bool(me.username) and mention != me.username.lower()
+
+class UpdateMetricsMiddleware(BaseMiddleware):
+    """Count every update by type and time its handling"""
+
+    async def __call__(
+        self,
+        handler: Callable[[Update, Dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: Dict[str, Any]
+    ) -> Any:
+        update_type = getattr(event, "event_type", None) or "unknown"
+        metrics.updates[update_type] += 1
+        metrics.in_flight += 1
+        start = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception:
+            metrics.update_errors[update_type] += 1
+            raise
+        finally:
+            metrics.in_flight -= 1
+            metrics.update_latency.observe((time.perf_counter() - start) * 1000)
+
+class CommandEventMiddleware(BaseMiddleware):
+    """Time each command, split by part, and record it in metrics and the event stream"""
+
+    async def __call__(
+        self,
+        handler: Callable[[Message, Dict[str, Any]], Awaitable[Any]],
+        event: Message,
+        data: Dict[str, Any]
+    ) -> Any:
+        command, mention = parse_command(event)
+        if not command or await addressed_elsewhere(data.get("bot"), mention):
+            return await handler(event, data)
+
+        token = current_command.set(command)
+        timings_token = start_request()
+        start = time.perf_counter()
+        error = False
+        result = UNHANDLED
+        try:
+            result = await handler(event, data)
+            return result
+        except Exception:
+            error = True
+            raise
+        finally:
+            latency_ms = (time.perf_counter() - start) * 1000
+            # Text after "/" is user input: only commands a handler matched get
+            # their own key, typos and junk share one bucket
+            if result is UNHANDLED and not error:
+                command = OTHER_COMMAND
+            metrics.observe_command(command, latency_ms, finish_request(timings_token), error)
+            current_command.reset(token)
+            user = event.from_user
+            log_command_usage(user.id if user else None, user.username if user else None,
+                              command, latency_ms)
+
+class ApiTimingMiddleware(BaseRequestMiddleware):
+    """Count and time outgoing Bot API calls"""
+
+    async def __call__(self, make_request, bot, method):
+        name = type(method).__name__
+        start = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        except Exception:
+            metrics.api_errors[name] += 1
+            raise
+        finally:
+            metrics.api_calls[name] += 1
+            record_time("api", time.perf_counter() - start)
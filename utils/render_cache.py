@@ -0,0 +1,118 @@
+"""
+🧩 RENDER CACHE
+Content-addressed cache of rendered images (memory + disk)
+"""
+
+import hashlib
+import json
+from datetime import date, datetime
+from typing import Any, Dict, Optional
+
+from config import Config
+from utils.cache import DiskLRUCache, LRUCache
+
+# Templates whose output depends only on their arguments
+CACHED_TEMPLATES = {"create_garden_image", "create_family_tree_image", "create_profile_card"}
+
+# Bump when template drawing code changes so old renders are not served
+RENDER_CACHE_VERSION = 4
+
+# File signature -> extension for upload filenames
+IMAGE_SIGNATURES = [(b"\x89PNG", "png"), (b"\xff\xd8", "jpg"), (b"RIFF", "webp")]
+
+def _normalize(value: Any) -> Any:
+    """JSON fallback for values that appear in render arguments"""
+    if isinstance(value, (bytes, bytearray)):
+        return "sha256:" + hashlib.sha256(value).hexdigest()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=repr)
+    return str(value)
+
+def render_key(method: str, args: tuple, kwargs: dict) -> str:
+    """Hash of the template name and its exact inputs"""
+    payload = json.dumps(
+        [RENDER_CACHE_VERSION, Config.VERSION, Config.IMAGE_ENCODING, Config.IMAGE_FAST_ENCODE,
+         method, args, kwargs],
+        sort_keys=True, default=_normalize, separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+class RenderedImage:
+    """Rendered image bytes plus their cache key (None if not cacheable)"""
+
+    def __init__(self, key: Optional[str], data: bytes):
+        self.key = key
+        self.data = data
+
+    def filename(self, name: str) -> str:
+        """Upload filename with the extension of the encoded format"""
+        for signature, extension in IMAGE_SIGNATURES:
+            if self.data.startswith(signature):
+                return f"{name}.{extension}"
+        return f"{name}.png"
+
+class RenderCache:
+    """Rendered image bytes by content key, memory tier in front of disk"""
+
+    def __init__(self):
+        self.memory = LRUCache(maxsize=Config.RENDER_CACHE_MEMORY_ITEMS)
+        self.disk = DiskLRUCache(
+            Config.RENDER_CACHE_DIR,
+            Config.RENDER_CACHE_MAX_MB * 1024 * 1024,
+            suffix=".img"
+        )
+        # Telegram file_id of each image once it has been uploaded
+        self.file_ids = LRUCache(maxsize=Config.RENDER_CACHE_MEMORY_ITEMS * 4)
+        self.file_ids_disk = DiskLRUCache(
+            Config.RENDER_CACHE_DIR,
+            Config.RENDER_CACHE_MAX_MB * 1024 * 1024 // 100,
+            suffix=".fid"
+        )
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """Get rendered bytes, promoting disk hits to memory"""
+        data = self.memory.get(key)
+        if data is not None:
+            return data
+
+        data = await self.disk.get(key)
+        if data is not None:
+            self.memory.set(key, data)
+        return data
+
+    async def set(self, key: str, data: bytes):
+        """Store rendered bytes in both tiers"""
+        self.memory.set(key, data)
+        await self.disk.set(key, data)
+
+    async def get_file_id(self, key: str) -> Optional[str]:
+        """Get the Telegram file_id an image was uploaded as"""
+        file_id = self.file_ids.get(key)
+        if file_id is None:
+            data = await self.file_ids_disk.get(key)
+            if data:
+                file_id = data.decode()
+                self.file_ids.set(key, file_id)
+        return file_id
+
+    async def set_file_id(self, key: str, file_id: str):
+        """Remember the Telegram file_id of an uploaded image"""
+        self.file_ids.set(key, file_id)
+        await self.file_ids_disk.set(key, file_id.encode())
+
+    async def forget_file_id(self, key: str):
+        """Drop a file_id Telegram no longer accepts"""
+        self.file_ids.pop(key)
+        await self.file_ids_disk.discard(key)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters for both tiers and file_id reuse"""
+        return {
+            "memory": self.memory.stats(),
+            "disk": self.disk.stats(),
+            "file_ids": self.file_ids.stats()
+        }
+
+render_cache = RenderCache()